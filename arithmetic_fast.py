@@ -0,0 +1,398 @@
+import re
+import ast
+from decimal import Decimal
+from fractions import Fraction
+
+# Inputs within all of these limits are cheap enough to evaluate inline on the request thread
+MAX_EXPR_LENGTH = 200
+MAX_DISTRIBUTED_TERMS = 64  # distributing (a+b)*(c+d)*... multiplies out term counts
+MAX_EXPONENT = 64
+MAX_RESULT_BITS = 10_000  # keeps powers cheap and results printable
+MAX_SCAFFOLD_DIGITS = 6  # beyond this, place-value breakdowns are noise
+
+_MIXED_NUMBER_RE = re.compile(r'(?<![\d.])(\d+)\s+(\d+)/(\d+)')
+_IMPLICIT_MULT_RE = re.compile(r'(\d)\s+(\d)')
+_ARITHMETIC_RE = re.compile(r'[\d\s\.\+\-\*\/\(\)]+')
+
+
+class _NotArithmetic(Exception):
+    """The expression needs the SymPy walker (symbols, functions, fractional powers...)."""
+
+
+def format_value(val: Fraction, fraction_mode=False) -> str:
+    """Same output as math_processor.format_number, for exact Fractions."""
+    if fraction_mode or val.denominator == 1:
+        return str(val)
+    return f"{float(val):.6f}".rstrip("0").rstrip(".")
+
+
+def decompose_number(n):
+    parts = []
+    place = 1
+    while n > 0:
+        digit = n % 10
+        if digit != 0:
+            parts.append(digit * place)
+        n //= 10
+        place *= 10
+    return list(reversed(parts))
+
+
+class _ArithmeticTutor:
+    """
+    Walks a Python AST of + - * / ** over numbers, yielding the scaffolded
+    tutor steps as it goes. Every walk/handle method is a generator whose
+    return value is the node's exact Fraction (value = yield from ...).
+    """
+
+    def __init__(self, fraction_mode=False):
+        self.fraction_mode = fraction_mode
+
+    # --- Messaging helpers ---
+    @staticmethod
+    def thought(msg):
+        return f"💭 Pause & Think: {msg}"
+
+    @staticmethod
+    def coach(msg):
+        return f"🧠 Strategy: {msg}"
+
+    def fmt(self, val):
+        return format_value(val, self.fraction_mode)
+
+    # --- Tree helpers ---
+    @staticmethod
+    def _terms(node, sign=1):
+        """Flatten a chain of + and - into [(sign, node)]."""
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub)):
+            right_sign = sign if isinstance(node.op, ast.Add) else -sign
+            return _ArithmeticTutor._terms(node.left, sign) + [(right_sign, node.right)]
+        return [(sign, node)]
+
+    @staticmethod
+    def _factors(node):
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult):
+            return _ArithmeticTutor._factors(node.left) + [node.right]
+        return [node]
+
+    @staticmethod
+    def _src(node):
+        """Source text for a factor, parenthesized if it is a sum."""
+        text = ast.unparse(node)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub)):
+            return f"({text})"
+        return text
+
+    @staticmethod
+    def _int_literal(node):
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            inner = _ArithmeticTutor._int_literal(node.operand)
+            return None if inner is None else -inner
+        if isinstance(node, ast.Constant) and type(node.value) is int:
+            return node.value
+        return None
+
+    # --- Handlers ---
+    def walk(self, node):
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            if type(node.value) is int:
+                return Fraction(node.value)
+            return Fraction(Decimal(repr(node.value)))  # 0.1 means one tenth, not the nearest double
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            value = yield from self.walk(node.operand)
+            return -value if isinstance(node.op, ast.USub) else value
+        if isinstance(node, ast.BinOp):
+            if isinstance(node.op, (ast.Add, ast.Sub)):
+                return (yield from self.handle_addition(node))
+            if isinstance(node.op, ast.Mult):
+                return (yield from self.handle_multiplication(node))
+            if isinstance(node.op, ast.Div):
+                return (yield from self.handle_division(node))
+            if isinstance(node.op, ast.Pow):
+                return (yield from self.handle_power(node))
+        raise _NotArithmetic(ast.dump(node))
+
+    def handle_addition(self, node):
+        yield f"\n🔎 I see addition/subtraction → {ast.unparse(node)}"
+        yield self.thought("Should we evaluate any parts first before combining?")
+
+        terms = self._terms(node)
+        values = []
+        for sign, term in terms:
+            values.append((sign, (yield from self.walk(term))))
+        result = sum(sign * value for sign, value in values)
+
+        shown = self.fmt(values[0][1]) if values[0][0] > 0 else f"-{self.fmt(values[0][1])}"
+        for sign, value in values[1:]:
+            shown += f" {'+' if sign > 0 else '-'} {self.fmt(value)}"
+        yield "➕ Combine:"
+        yield f"   {shown} = {self.fmt(result)}"
+
+        yield self.thought("Is the final number larger or smaller than the biggest addend?")
+        return result
+
+    def handle_multiplication(self, node):
+        yield f"\n🔎 We see multiplication → {ast.unparse(node)}"
+        yield self.thought("Can any of these numbers be broken into easier parts?")
+        factors = self._factors(node)
+
+        # Distribution case
+        sums = [f for f in factors if isinstance(f, ast.BinOp) and isinstance(f.op, (ast.Add, ast.Sub))]
+        if sums:
+            yield self.coach("When multiplication touches parentheses, we distribute.")
+            yield self.thought("What does multiplying across a sum remind you of?")
+
+            target = sums[0]
+            others = [self._src(f) for f in factors if f is not target]
+            distributed = ""
+            for i, (sign, term) in enumerate(self._terms(target)):
+                piece = " * ".join([self._src(term)] + others)
+                if i == 0:
+                    distributed = piece if sign > 0 else f"-({piece})"
+                else:
+                    distributed += f" {'+' if sign > 0 else '-'} {piece}"
+
+            yield f"🪜 After distributing:\n   {distributed}"
+            yield self.thought("Why does distributing preserve the total value?")
+            return (yield from self.walk(ast.parse(distributed, mode="eval").body))
+
+        nums = [self._int_literal(f) for f in factors]
+        if all(n is not None for n in nums):
+            return Fraction((yield from self._multiply_integers(nums)))
+
+        # Fractions, decimals or sub-expressions
+        yield self.coach("Evaluate each factor first, then combine.")
+        values = []
+        for f in factors:
+            values.append((yield from self.walk(f)))
+        result = Fraction(1)
+        for value in values:
+            result *= value
+        yield f"✖️ Combine → {' × '.join(self.fmt(v) for v in values)} = {self.fmt(result)}"
+        return result
+
+    def _multiply_integers(self, nums):
+        if len(nums) == 2:
+            a, b = nums
+            digits_a = len(str(abs(a)))
+            digits_b = len(str(abs(b)))
+            sign = -1 if (a < 0) != (b < 0) else 1
+
+            # Single-digit × single-digit
+            if digits_a == 1 and digits_b == 1:
+                yield self.coach("Both are single digits — direct multiplication.")
+                result = a * b
+                yield f"   {a} × {b} = {result}"
+                yield self.thought("Does that match any ideas that you already know?")
+                return result
+
+            if max(digits_a, digits_b) > MAX_SCAFFOLD_DIGITS:
+                yield self.coach("These are big numbers — multiply directly and check with an estimate.")
+                result = a * b
+                yield f"   {a} × {b} = {result}"
+                return result
+
+            # Multi-digit × single-digit (either order)
+            if digits_a == 1 or digits_b == 1:
+                big, small = (a, b) if digits_b == 1 else (b, a)
+                yield self.coach("Break the larger number using place value.")
+
+                parts = decompose_number(abs(big))
+                yield f"   {abs(big)} = {' + '.join(map(str, parts))}"
+                yield self.thought("Why is breaking by place value helpful here?")
+
+                partials = []
+                for p in parts:
+                    val = p * abs(small)
+                    partials.append(val)
+                    yield f"   {p} × {abs(small)} = {val}"
+
+                total = sum(partials)
+                yield "➕ Add partial products:"
+                yield f"   {' + '.join(map(str, partials))} = {total}"
+                if sign < 0:
+                    yield f"   One factor is negative, so the product is {-total}"
+
+                yield self.thought("Why does adding these give the answer we want?")
+                return sign * total
+
+            # Multi-digit × multi-digit
+            yield self.coach("Break BOTH numbers (area model thinking).")
+
+            parts_a = decompose_number(abs(a))
+            parts_b = decompose_number(abs(b))
+            yield f"   {abs(a)} = {' + '.join(map(str, parts_a))}"
+            yield f"   {abs(b)} = {' + '.join(map(str, parts_b))}"
+
+            yield self.thought("How many smaller multiplications will we create?")
+
+            partials = []
+            for pa in parts_a:
+                for pb in parts_b:
+                    val = pa * pb
+                    partials.append(val)
+                    yield f"   {pa} × {pb} = {val}"
+
+            total = sum(partials)
+            yield "➕ Add all partial products:"
+            yield f"   {' + '.join(map(str, partials))} = {total}"
+            if sign < 0:
+                yield f"   One factor is negative, so the product is {-total}"
+
+            yield self.thought("Does this result seem reasonable compared to jus estimating it")
+            return sign * total
+
+        # More than 2 numbers
+        yield self.coach("Multiply step-by-step from left to right.")
+        current = nums[0]
+        for n in nums[1:]:
+            yield self.thought(f"What happens when we multiply {current} by {n}?")
+            yield f"   {current} × {n}"
+            current *= n
+
+        yield f"✖️ Final result = {current}"
+        return current
+
+    def handle_division(self, node):
+        yield "\n🔎 Division detected."
+        yield self.thought("Division can be thought of as splitting or fractions.")
+
+        num = yield from self.walk(node.left)
+        denom = yield from self.walk(node.right)
+        if denom == 0:
+            raise ZeroDivisionError("division by zero")
+
+        result = num / denom
+        yield f"➗ {self.fmt(num)} ÷ {self.fmt(denom)} = {self.fmt(result)}"
+
+        yield self.thought("Does this quotient make sense in size?")
+        return result
+
+    def handle_power(self, node):
+        base = yield from self.walk(node.left)
+        exp = yield from self.walk(node.right)
+        size = max(base.numerator.bit_length(), base.denominator.bit_length()) * abs(exp)
+        if exp.denominator != 1 or abs(exp) > MAX_EXPONENT or size > MAX_RESULT_BITS:
+            raise _NotArithmetic("fractional or huge exponent")  # roots and towers go to SymPy
+        if base == 0 and exp < 0:
+            raise ZeroDivisionError("zero to a negative power")
+
+        yield f"\n🔎 Exponent detected → {self.fmt(base)}^{self.fmt(exp)}"
+        yield self.thought("What does an exponent represent conceptually?")
+
+        result = base ** int(exp)
+        if exp > 1:
+            yield self.coach(f"Multiply {self.fmt(base)} by itself {int(exp)} times.")
+        elif exp < 0:
+            yield self.coach("Negative exponent → take reciprocal.")
+        yield f"   Result = {self.fmt(result)}"
+        return result
+
+
+def normalize_arithmetic(expr_str: str) -> str:
+    """Mixed numbers ("2 3/4") become (11/4); "23 7" becomes 23*7."""
+    def convert_mixed(match):
+        whole, num, den = map(int, match.groups())
+        return f"({whole * den + num}/{den})"
+    expr_str = _MIXED_NUMBER_RE.sub(convert_mixed, expr_str.strip().replace("^", "**"))
+    return _IMPLICIT_MULT_RE.sub(r'\1*\2', expr_str)
+
+
+def _check(node) -> Fraction:
+    """
+    Evaluate without steps, raising what the tutor would raise part-way
+    through (_NotArithmetic, ZeroDivisionError, OverflowError), so a stream
+    is only started for input it can finish. Microseconds, even for big trees.
+    """
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return Fraction(node.value) if type(node.value) is int else Fraction(Decimal(repr(node.value)))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _check(node.operand)
+        return -value if isinstance(node.op, ast.USub) else value
+    if not isinstance(node, ast.BinOp) or not isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow)):
+        raise _NotArithmetic(ast.dump(node))
+    left, right = _check(node.left), _check(node.right)
+    if isinstance(node.op, ast.Pow):
+        size = max(left.numerator.bit_length(), left.denominator.bit_length()) * abs(right)
+        if right.denominator != 1 or abs(right) > MAX_EXPONENT or size > MAX_RESULT_BITS:
+            raise _NotArithmetic("fractional or huge exponent")
+        if left == 0 and right < 0:
+            raise ZeroDivisionError("zero to a negative power")
+        result = left ** int(right)
+    elif isinstance(node.op, ast.Div):
+        if right == 0:
+            raise ZeroDivisionError("division by zero")
+        result = left / right
+    elif isinstance(node.op, ast.Mult):
+        result = left * right
+    else:
+        result = left + right if isinstance(node.op, ast.Add) else left - right
+    format_value(result)  # a non-integer beyond float range cannot be shown
+    return result
+
+
+def _distributed_terms(node):
+    """
+    How many terms the tutor ends up walking once every product of sums is
+    distributed (it re-walks each distributed term, so this is a product).
+    Raises _NotArithmetic past MAX_DISTRIBUTED_TERMS.
+    """
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub)):
+        count = sum(_distributed_terms(term) for _, term in _ArithmeticTutor._terms(node))
+    elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult):
+        count = 1
+        for factor in _ArithmeticTutor._factors(node):
+            count *= _distributed_terms(factor)
+            if count > MAX_DISTRIBUTED_TERMS:
+                break
+    elif isinstance(node, ast.BinOp):
+        _distributed_terms(node.left)
+        _distributed_terms(node.right)
+        count = 1
+    elif isinstance(node, ast.UnaryOp):
+        count = _distributed_terms(node.operand)
+    else:
+        count = 1
+    if count > MAX_DISTRIBUTED_TERMS:
+        raise _NotArithmetic("too many terms to distribute")
+    return count
+
+
+def _tutor_steps(tutor, expr_str, tree):
+    yield f"🟢 Let's solve this together:\n   {expr_str}"
+    yield "We’ll move slowly and make sure each idea actually makes sense."
+    final_result = tutor.fmt((yield from tutor.walk(tree)))
+
+    yield "\n🎯 Final Answer:"
+    yield f"   {final_result}"
+
+    yield tutor.thought("Could you explain one of the steps in your own words?")
+    yield "That’s how you lock understanding in."
+
+
+def arithmetic_step_stream(expr_str: str, fraction_mode=False):
+    """
+    Scaffolded arithmetic steps computed with exact Fractions from Python's
+    AST, without SymPy, as an iterator that yields each step as soon as it
+    is worked out. Returns None when the input is not plain arithmetic
+    (symbols, functions, roots, huge powers) or would need too much
+    distributing, so the caller can use the SymPy walker in a worker instead.
+    """
+    if len(expr_str) > MAX_EXPR_LENGTH or not _ARITHMETIC_RE.fullmatch(expr_str.replace("^", "**")):
+        return None
+    expr_str = normalize_arithmetic(expr_str)
+    try:
+        tree = ast.parse(expr_str, mode="eval").body
+        _check(tree)
+        _distributed_terms(tree)
+    except (SyntaxError, _NotArithmetic, OverflowError, ValueError):
+        return None
+    except ZeroDivisionError as e:
+        return iter([f"⚠️ Unable to process your math problem: {e}"])
+    return _tutor_steps(_ArithmeticTutor(fraction_mode), expr_str, tree)
+
+
+def arithmetic_steps_fast(expr_str: str, fraction_mode=False):
+    """arithmetic_step_stream joined into one answer (None when not plain arithmetic)."""
+    steps = arithmetic_step_stream(expr_str, fraction_mode)
+    return None if steps is None else "\n".join(steps)
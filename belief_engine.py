@@ -0,0 +1,261 @@
+import os
+import json
+import math
+import time
+import atexit
+import threading
+from datetime import datetime
+
+import numpy as np
+
+EMOTION_WEIGHTS = {
+    "positive": 1.5,
+    "neutral": 1.0,
+    "negative": 0.5
+}
+
+
+class BeliefEngine:
+    """
+    Array-backed belief store shared by many users.
+
+    Tags are interned to integer column ids and users to row ids. weights[r, c]
+    holds a user's weight for a tag as of stamps[r, c]; decay is applied with
+    one vectorized exp() over whatever slice is being read. A weight of 0 means
+    "no belief". Rows/columns grow by doubling.
+
+    With a file_path, changes are written behind like BeliefModel: mutations
+    mark the engine dirty and it is saved at most every flush_interval seconds
+    (background thread) or after flush_after mutations, whichever is first.
+    """
+
+    PRUNE_THRESHOLD = 0.1
+
+    def __init__(self, decay_rate=0.01, file_path=None, flush_interval=5.0, flush_after=500):
+        if not 0 <= decay_rate < 1:
+            raise ValueError("decay_rate must be in [0, 1)")
+        self.decay_rate = decay_rate
+        self._log_retention = math.log1p(-decay_rate)
+        self.file_path = file_path
+        self.flush_interval = flush_interval
+        self.flush_after = flush_after
+        self.dirty = 0
+        self._lock = threading.RLock()
+
+        self.tags = []
+        self.tag_ids = {}
+        self.users = {}
+        self.weights = np.zeros((16, 64))
+        self.stamps = np.zeros((16, 64))
+
+        if file_path and os.path.exists(file_path):
+            self.load(file_path)
+        if file_path:
+            atexit.register(self.save)
+            threading.Thread(target=self._flush_loop, daemon=True).start()
+
+    # --- Internal helpers ---
+    def _grow(self, rows, cols):
+        cap_rows, cap_cols = self.weights.shape
+        if rows <= cap_rows and cols <= cap_cols:
+            return
+        while cap_rows < rows:
+            cap_rows *= 2
+        while cap_cols < cols:
+            cap_cols *= 2
+        for name in ("weights", "stamps"):
+            old = getattr(self, name)
+            new = np.zeros((cap_rows, cap_cols))
+            new[:old.shape[0], :old.shape[1]] = old
+            setattr(self, name, new)
+
+    def _row(self, user_id):
+        row = self.users.get(user_id)
+        if row is None:
+            row = self.users[user_id] = len(self.users)
+            self._grow(len(self.users), len(self.tags))
+        return row
+
+    def _tag_id(self, tag):
+        col = self.tag_ids.get(tag)
+        if col is None:
+            col = self.tag_ids[tag] = len(self.tags)
+            self.tags.append(tag)
+            self._grow(len(self.users), len(self.tags))
+        return col
+
+    def _decayed(self, weights, stamps, now):
+        return weights * np.exp(self._log_retention * np.maximum(now - stamps, 0.0))
+
+    def _mark_dirty(self):
+        self.dirty += 1
+        if self.dirty >= self.flush_after:
+            self.flush()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[BeliefEngine] Background save failed: {e}")
+
+    # --- Public methods ---
+    def reinforce_batch(self, updates, now=None):
+        """
+        Apply many reinforcements at once.
+        updates: iterable of (user_id, tag, multiplier); repeated pairs are summed.
+        """
+        now = now or datetime.now().timestamp()
+        with self._lock:
+            rows, cols, mults = [], [], []
+            for user_id, tag, multiplier in updates:
+                rows.append(self._row(user_id))
+                cols.append(self._tag_id(tag))
+                mults.append(multiplier)
+            if not rows:
+                return
+
+            n_cols = self.weights.shape[1]
+            flat = np.asarray(rows) * n_cols + np.asarray(cols)
+            cells, inverse = np.unique(flat, return_inverse=True)
+            added = np.bincount(inverse, weights=np.asarray(mults, dtype=float))
+            r, c = np.divmod(cells, n_cols)
+
+            current = self._decayed(self.weights[r, c], self.stamps[r, c], now)
+            current[current < self.PRUNE_THRESHOLD] = 0.0
+            self.weights[r, c] = current + added
+            self.stamps[r, c] = now
+            self._mark_dirty()
+
+    def decay_all(self, now=None):
+        """Rebase every weight to `now` and drop the ones below the threshold, in one pass."""
+        now = now or datetime.now().timestamp()
+        with self._lock:
+            n_users, n_tags = len(self.users), len(self.tags)
+            w = self._decayed(self.weights[:n_users, :n_tags], self.stamps[:n_users, :n_tags], now)
+            w[w < self.PRUNE_THRESHOLD] = 0.0
+            self.weights[:n_users, :n_tags] = w
+            self.stamps[:n_users, :n_tags] = now
+            self._mark_dirty()
+
+    def current_weights(self, user_id, now=None):
+        """Decayed weight vector for one user (length = vocabulary size)."""
+        now = now or datetime.now().timestamp()
+        with self._lock:
+            row = self.users.get(user_id)
+            n_tags = len(self.tags)
+            if row is None:
+                return np.zeros(n_tags)
+            w = self._decayed(self.weights[row, :n_tags], self.stamps[row, :n_tags], now)
+        w[w < self.PRUNE_THRESHOLD] = 0.0
+        return w
+
+    def top_beliefs(self, user_id, n=3, now=None):
+        """Strongest n (tag, weight) pairs for a user."""
+        w = self.current_weights(user_id, now)
+        return self._top(w, n)
+
+    def most_common_beliefs(self, n=10, by="weight", now=None):
+        """
+        Beliefs that are strongest across all users.
+        by="weight" sums decayed weights; by="users" counts users holding the belief.
+        """
+        now = now or datetime.now().timestamp()
+        with self._lock:
+            n_users, n_tags = len(self.users), len(self.tags)
+            w = self._decayed(self.weights[:n_users, :n_tags], self.stamps[:n_users, :n_tags], now)
+        w[w < self.PRUNE_THRESHOLD] = 0.0
+        totals = (w > 0).sum(axis=0) if by == "users" else w.sum(axis=0)
+        return self._top(totals, n)
+
+    def _top(self, values, n):
+        live = np.count_nonzero(values)
+        n = min(n, live)
+        if n <= 0:
+            return []
+        idx = np.argpartition(-values, n - 1)[:n]
+        idx = idx[np.argsort(-values[idx])]
+        return [(self.tags[i], float(values[i])) for i in idx]
+
+    def reset_user(self, user_id):
+        with self._lock:
+            row = self.users.get(user_id)
+            if row is not None:
+                self.weights[row, :] = 0.0
+                self.stamps[row, :] = 0.0
+                self._mark_dirty()
+
+    def flush(self):
+        """Save now if anything changed since the last save."""
+        if self.dirty:
+            self.save()
+
+    def save(self, file_path=None):
+        file_path = file_path or self.file_path
+        if not file_path:
+            return
+        with self._lock:
+            if file_path == self.file_path:
+                self.dirty = 0
+            n_users, n_tags = len(self.users), len(self.tags)
+            meta = json.dumps({"tags": self.tags, "users": list(self.users), "decay_rate": self.decay_rate})
+            tmp_path = file_path + ".tmp.npz"
+            np.savez(tmp_path, weights=self.weights[:n_users, :n_tags],
+                     stamps=self.stamps[:n_users, :n_tags], meta=np.array(meta))
+            os.replace(tmp_path, file_path)  # under the lock: background and inline saves share tmp_path
+
+    def load(self, file_path):
+        with np.load(file_path) as data:
+            meta = json.loads(str(data["meta"]))
+            with self._lock:
+                self.tags = meta["tags"]
+                self.tag_ids = {tag: i for i, tag in enumerate(self.tags)}
+                self.users = {user: i for i, user in enumerate(meta["users"])}
+                self.weights = np.zeros((16, 64))
+                self.stamps = np.zeros((16, 64))
+                self._grow(max(len(self.users), 1), max(len(self.tags), 1))
+                self.weights[:len(self.users), :len(self.tags)] = data["weights"]
+                self.stamps[:len(self.users), :len(self.tags)] = data["stamps"]
+
+
+class EngineBeliefModel:
+    """
+    BeliefModel-compatible view of one user's row in a shared BeliefEngine.
+    """
+
+    def __init__(self, user_name, engine: BeliefEngine):
+        self.user_name = user_name
+        self.engine = engine
+
+    def reinforce_beliefs(self, belief_tags, emotion="neutral"):
+        multiplier = EMOTION_WEIGHTS.get(emotion, 1.0)
+        self.engine.reinforce_batch((self.user_name, tag, multiplier) for tag in belief_tags)
+
+    def get_ranked_beliefs(self, start=0, stop=None):
+        w = self.engine.current_weights(self.user_name)
+        stop = np.count_nonzero(w) if stop is None else stop
+        return self.engine._top(w, stop)[start:]
+
+    def get_belief_rank(self, tag):
+        col = self.engine.tag_ids.get(tag)
+        w = self.engine.current_weights(self.user_name)
+        if col is None or w[col] <= 0:
+            return None
+        return int((w > w[col]).sum()) + 1
+
+    def get_strongest_beliefs(self, top_n=3):
+        return [(tag, round(weight, 2)) for tag, weight in self.engine.top_beliefs(self.user_name, top_n)]
+
+    def get_all_beliefs(self):
+        w = self.engine.current_weights(self.user_name)
+        return {self.engine.tags[i]: round(float(w[i]), 2) for i in np.flatnonzero(w)}
+
+    def reset(self):
+        self.engine.reset_user(self.user_name)
+
+    def flush(self, fsync=False):
+        self.engine.flush()
+
+    def close(self):
+        self.engine.flush()
@@ -1,39 +1,202 @@
 import os
 import json
+import math
+import time
+import atexit
+import weakref
+import threading
 from datetime import datetime
 
+from sorted_index import SortedIndex
+
+
+class _BeliefSweeper:
+    """
+    One shared daemon thread that does housekeeping for every live BeliefModel:
+    periodically pruning decayed beliefs and flushing write-behind changes, so
+    reinforce calls never walk the whole model or rewrite the file.
+    """
+
+    TICK_SECONDS = 1.0
+
+    def __init__(self):
+        self._models = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, model):
+        with self._lock:
+            self._models.add(model)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.TICK_SECONDS)
+            now = datetime.now().timestamp()
+            for model in list(self._models):
+                try:
+                    if now - model.last_sweep >= model.prune_interval:
+                        model.prune(now)
+                    if model.dirty and now - model.last_flush >= model.flush_interval:
+                        model.flush()
+                except Exception as e:
+                    print(f"[BeliefSweeper] Housekeeping failed for {model.user_name}: {e}")
+
+    def flush_all(self):
+        """Write out every model with pending changes (registered with atexit)."""
+        for model in list(self._models):
+            try:
+                model.flush(fsync=True)
+            except Exception as e:
+                print(f"[BeliefSweeper] Final flush failed for {model.user_name}: {e}")
+
+
+_sweeper = _BeliefSweeper()
+atexit.register(_sweeper.flush_all)
+
+
 class BeliefModel:
-    def __init__(self, user_name, decay_rate=0.01):
+    PRUNE_THRESHOLD = 0.1
+
+    def __init__(self, user_name, decay_rate=0.01, prune_interval=60.0,
+                 write_behind=True, flush_interval=5.0, flush_after=20, max_beliefs=None):
         self.user_name = user_name
         self.file_path = f"{user_name}_belief_model.json"
         # Store beliefs as { tag: {"weight": float, "last_reinforced": timestamp} }
+        # "weight" is the value at "last_reinforced"; decay is applied lazily on read.
         self.beliefs = {}
+        if not 0 <= decay_rate < 1:
+            raise ValueError("decay_rate must be in [0, 1)")
         self.decay_rate = decay_rate  # e.g. 0.01 means 1% decay per second
+        # ln of the fraction kept per second, so decay is a single exp() instead of a ** per belief
+        self._log_retention = math.log1p(-decay_rate)
+        # Ranked view: every belief decays by the same factor, so ordering by
+        # ln(weight) - log_retention * last_reinforced never changes with time.
+        self._ranked = SortedIndex()
+        self._rank_keys = {}
+        self.prune_interval = prune_interval
+        self.last_sweep = datetime.now().timestamp()
+        # Write-behind: mutations mark the model dirty; the file is rewritten at most
+        # every flush_interval seconds or after flush_after mutations, whichever is first.
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_after = flush_after
+        self.dirty = 0
+        self.last_flush = datetime.now().timestamp()
+        # Bounded mode (Space-Saving heavy hitters): keep at most max_beliefs tags.
+        # A new tag evicts the weakest one and inherits its weight, which is
+        # recorded as "error" so the true weight is known to lie in [weight - error, weight].
+        self.max_beliefs = max_beliefs
+        self._lock = threading.RLock()
         self._load()
+        _sweeper.register(self)
 
     def _load(self):
         if os.path.exists(self.file_path):
             with open(self.file_path, 'r') as f:
                 self.beliefs = json.load(f)
+            self._rebuild_ranking()
+            if self.max_beliefs:
+                while len(self.beliefs) > self.max_beliefs:
+                    self._drop_belief(self._ranked.last()[1])
         else:
             self._save()
 
-    def _save(self):
-        with open(self.file_path, 'w') as f:
+    def _rank_key(self, tag, data):
+        strength = math.log(max(data["weight"], 1e-300)) - self._log_retention * data["last_reinforced"]
+        return (-strength, tag)
+
+    def _rebuild_ranking(self):
+        self._rank_keys = {tag: self._rank_key(tag, data) for tag, data in self.beliefs.items()}
+        self._ranked = SortedIndex(self._rank_keys.values())
+
+    def _set_belief(self, tag, data):
+        old_key = self._rank_keys.get(tag)
+        if old_key is not None:
+            self._ranked.remove(old_key)
+        self.beliefs[tag] = data
+        self._rank_keys[tag] = key = self._rank_key(tag, data)
+        self._ranked.add(key)
+
+    def _drop_belief(self, tag):
+        del self.beliefs[tag]
+        self._ranked.remove(self._rank_keys.pop(tag))
+
+    def _save(self, fsync=False):
+        """Atomically replace the belief file (write to a temp file, then rename)."""
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, 'w') as f:
             json.dump(self.beliefs, f, indent=4)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+
+    def _mark_dirty(self):
+        self.dirty += 1
+        if not self.write_behind or self.dirty >= self.flush_after:
+            self.flush()
+
+    def flush(self, fsync=False):
+        """Persist pending changes now. Pass fsync=True to force them to stable storage."""
+        with self._lock:
+            if not self.dirty:
+                return
+            self._save(fsync=fsync)
+            self.dirty = 0
+            self.last_flush = datetime.now().timestamp()
+
+    def close(self):
+        """Flush and sync outstanding changes (e.g. when a session ends)."""
+        self.flush(fsync=True)
+
+    def __del__(self):
+        # The sweeper holds only a weak reference, so a model dropped between
+        # flushes (e.g. a session replaced by /start) saves its pending changes here
+        try:
+            self.flush(fsync=True)
+        except Exception:
+            pass
+
+    def _decayed(self, data, now):
+        """Closed-form decay: weight * (1 - rate) ** elapsed, evaluated as one exp()."""
+        elapsed = max(0.0, now - data["last_reinforced"])
+        return data["weight"] * math.exp(self._log_retention * elapsed) if elapsed else data["weight"]
 
     def _apply_decay(self, tag):
         """Apply decay to a belief based on time elapsed since last reinforcement."""
-        now = datetime.now().timestamp()
-        belief = self.beliefs[tag]
-        time_passed = now - belief["last_reinforced"]
-        decayed_weight = belief["weight"] * ((1 - self.decay_rate) ** time_passed)
-        return decayed_weight
+        return self._decayed(self.beliefs[tag], datetime.now().timestamp())
+
+    def _evict_weakest(self, now):
+        """Drop the weakest belief and return its current weight (Space-Saving step)."""
+        tag = self._ranked.last()[1]
+        weight = self._decayed(self.beliefs[tag], now)
+        self._drop_belief(tag)
+        return weight if weight >= self.PRUNE_THRESHOLD else 0.0
+
+    def _reinforce(self, belief_tags, weight_multiplier, now):
+        """In-memory part of reinforcement: touches only the given tags."""
+        for tag in belief_tags:
+            data = self.beliefs.get(tag)
+            current = self._decayed(data, now) if data else 0.0
+            error = data["error"] * (current / data["weight"]) if data and data.get("error") else 0.0
+            if current < self.PRUNE_THRESHOLD:
+                current, error = 0.0, 0.0  # already pruned in spirit, start fresh
+
+            if data is None and self.max_beliefs and len(self.beliefs) >= self.max_beliefs:
+                current = error = self._evict_weakest(now)
+
+            belief = {"weight": current + weight_multiplier, "last_reinforced": now}
+            if error:
+                belief["error"] = error
+            self._set_belief(tag, belief)
 
     def reinforce_beliefs(self, belief_tags, emotion="neutral"):
         """
         Increment or create beliefs with emotion-weighted reinforcement.
-        Apply decay to all beliefs.
+        Only the reinforced tags are touched; everything else decays lazily.
         """
         emotion_weights = {
             "positive": 1.5,
@@ -43,49 +206,88 @@ class BeliefModel:
         weight_multiplier = emotion_weights.get(emotion, 1.0)
         now = datetime.now().timestamp()
 
-        # Decay all beliefs first
-        tags_to_delete = []
-        for tag, data in self.beliefs.items():
-            decayed_weight = self._apply_decay(tag)
-            if decayed_weight < 0.1:  # Threshold for pruning
-                tags_to_delete.append(tag)
-            else:
-                self.beliefs[tag]["weight"] = decayed_weight
+        with self._lock:
+            self._reinforce(belief_tags, weight_multiplier, now)
+            self._mark_dirty()
 
-        # Remove weak beliefs
-        for tag in tags_to_delete:
-            del self.beliefs[tag]
+    def prune(self, now=None):
+        """Drop beliefs whose decayed weight fell below the threshold (run by the background sweep)."""
+        now = now or datetime.now().timestamp()
+        with self._lock:
+            # The weakest beliefs sit at the end of the ranking, so stop at the first strong one
+            weak = []
+            for _, tag in reversed(self._ranked):
+                if self._decayed(self.beliefs[tag], now) >= self.PRUNE_THRESHOLD:
+                    break
+                weak.append(tag)
+            for tag in weak:
+                self._drop_belief(tag)
+            self.last_sweep = now
+            if weak:
+                self._mark_dirty()
+        return len(weak)
 
-        # Reinforce incoming tags
-        for tag in belief_tags:
-            if tag in self.beliefs:
-                self.beliefs[tag]["weight"] += weight_multiplier
-                self.beliefs[tag]["last_reinforced"] = now
-            else:
-                self.beliefs[tag] = {"weight": weight_multiplier, "last_reinforced": now}
+    def _current_weights(self):
+        now = datetime.now().timestamp()
+        with self._lock:
+            weights = {tag: self._decayed(data, now) for tag, data in self.beliefs.items()}
+        return {tag: w for tag, w in weights.items() if w >= self.PRUNE_THRESHOLD}
+
+    def get_ranked_beliefs(self, start=0, stop=None):
+        """
+        Return (tag, weight) pairs for ranks [start, stop), strongest first.
+        Walks the ranking lazily, so top-N costs O(N) regardless of how many beliefs exist.
+        """
+        now = datetime.now().timestamp()
+        with self._lock:
+            stop = len(self._ranked) if stop is None else stop
+            ranked = []
+            for _, tag in self._ranked.slice(start, stop):
+                weight = self._decayed(self.beliefs[tag], now)
+                if weight < self.PRUNE_THRESHOLD:
+                    break  # everything after this is weaker still
+                ranked.append((tag, weight))
+        return ranked
 
-        self._save()
+    def get_belief_rank(self, tag):
+        """1-based rank of a belief (1 = strongest), or None if it is unknown or decayed away."""
+        with self._lock:
+            data = self.beliefs.get(tag)
+            if data is None or self._decayed(data, datetime.now().timestamp()) < self.PRUNE_THRESHOLD:
+                return None
+            return self._ranked.rank(self._rank_keys[tag]) + 1
+
+    def get_weight_bounds(self, tag):
+        """
+        (lower, upper) bounds on a belief's current weight. They are equal unless
+        bounded mode had to estimate the tag's history when it was admitted.
+        """
+        with self._lock:
+            data = self.beliefs.get(tag)
+            if data is None:
+                return (0.0, 0.0)
+            weight = self._decayed(data, datetime.now().timestamp())
+            error = data.get("error", 0.0) * (weight / data["weight"])
+        return (round(weight - error, 2), round(weight, 2))
 
     def get_strongest_beliefs(self, top_n=3):
         """
         Return the top N beliefs sorted by weight descending.
         """
-        sorted_beliefs = sorted(
-            self.beliefs.items(),
-            key=lambda item: item[1]["weight"],
-            reverse=True
-        )
-        return [(tag, round(data["weight"], 2)) for tag, data in sorted_beliefs[:top_n]]
+        return [(tag, round(weight, 2)) for tag, weight in self.get_ranked_beliefs(0, top_n)]
 
     def get_all_beliefs(self):
         """
         Return all beliefs with weights.
         """
-        return {tag: round(data["weight"], 2) for tag, data in self.beliefs.items()}
+        return {tag: round(weight, 2) for tag, weight in self._current_weights().items()}
 
     def reset(self):
         """
         Reset all beliefs (use with caution).
         """
-        self.beliefs = {}
-        self._save()
\ No newline at end of file
+        with self._lock:
+            self.beliefs = {}
+            self._rebuild_ranking()
+            self.dirty += 1
+            self.flush()
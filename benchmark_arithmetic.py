@@ -0,0 +1,61 @@
+# Benchmark: scaffolded arithmetic steps, Fraction/AST fast path vs SymPy walker.
+# Run: python benchmark_arithmetic.py
+import time
+import argparse
+import statistics
+
+from arithmetic_fast import arithmetic_steps_fast
+from math_processor import step_by_step_arithmetic_sympy, parse_cache
+
+CORPUS = [
+    "23 * 7", "23 7", "45*23", "7 * 8", "2*3*4", "12 + 5 - 3", "7 - 10", "100 - 37 + 12",
+    "(2+3)*4", "3*(4-1)*2", "10/4", "144 / 12", "2 3/4 + 1/2", "1/3 + 1/6",
+    "1.5 + 2.25", "0.1 + 0.2", "2^10", "2**-2", "(8 - 3) * (2 + 6)", "999 * 999",
+]
+
+
+def final_answer(steps):
+    lines = steps.splitlines()
+    return lines[lines.index("🎯 Final Answer:") + 1].strip() if "🎯 Final Answer:" in lines else steps
+
+
+def sympy_uncached(q):
+    """The SymPy walker as the tutor ran it before: parsing every time, no warm parse cache."""
+    parse_cache.clear()
+    return step_by_step_arithmetic_sympy(q)
+
+
+def per_call_us(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for q in CORPUS:
+            fn(q)
+        samples.append((time.perf_counter() - start) / len(CORPUS) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arithmetic tutor fast path vs SymPy walker")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    misses = [q for q in CORPUS if arithmetic_steps_fast(q) is None]
+    print(f"Corpus: {len(CORPUS)} expressions, fast-path misses: {misses or 'none'}")
+    diffs = [(q, final_answer(arithmetic_steps_fast(q)), final_answer(step_by_step_arithmetic_sympy(q)))
+             for q in CORPUS if q not in misses]
+    diffs = [d for d in diffs if d[1] != d[2]]
+    print(f"Final answers that differ from SymPy: {len(diffs)}")
+    for q, fast, slow in diffs:
+        print(f"   {q!r}: fast={fast} sympy={slow}")
+
+    fast_us = per_call_us(arithmetic_steps_fast, args.repeats)
+    sympy_us = per_call_us(sympy_uncached, max(1, args.repeats // 4))
+    print(f"\n{'path':<28} {'per expression':>16}")
+    print(f"{'SymPy walker (before)':<28} {sympy_us:>13.1f} us")
+    print(f"{'Fraction/AST (after)':<28} {fast_us:>13.1f} us")
+    print(f"Speed-up: {sympy_us / fast_us:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
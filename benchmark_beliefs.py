@@ -0,0 +1,75 @@
+# Benchmark: BeliefModel reinforcement cost with a large belief store.
+# Run: python benchmark_beliefs.py [--beliefs 100000]
+import os
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from datetime import datetime
+
+from belief_system import BeliefModel
+
+
+def eager_reinforce(model, belief_tags, weight_multiplier, now):
+    """The previous algorithm: decay and prune every stored belief on every call."""
+    tags_to_delete = []
+    for tag, data in model.beliefs.items():
+        decayed = data["weight"] * ((1 - model.decay_rate) ** (now - data["last_reinforced"]))
+        if decayed < 0.1:
+            tags_to_delete.append(tag)
+        else:
+            model.beliefs[tag]["weight"] = decayed
+    for tag in tags_to_delete:
+        del model.beliefs[tag]
+    for tag in belief_tags:
+        if tag in model.beliefs:
+            model.beliefs[tag]["weight"] += weight_multiplier
+            model.beliefs[tag]["last_reinforced"] = now
+        else:
+            model.beliefs[tag] = {"weight": weight_multiplier, "last_reinforced": now}
+
+
+def seed_model(size, rng):
+    model = BeliefModel("benchmark", decay_rate=0.0001)
+    now = datetime.now().timestamp()
+    model.beliefs = {
+        f"tag{i}": {"weight": rng.uniform(1, 50), "last_reinforced": now - rng.uniform(0, 600)}
+        for i in range(size)
+    }
+    model._rebuild_ranking()
+    return model
+
+
+def time_calls(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BeliefModel reinforcement benchmark")
+    parser.add_argument("--beliefs", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    tags = ["offer math tips", "show steps", "check calculations"]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        print(f"{'beliefs':>10} | {'eager decay (ms)':>17} | {'lazy decay (ms)':>16} | {'prune sweep (ms)':>17}")
+        for size in (1_000, 10_000, args.beliefs):
+            eager_model = seed_model(size, rng)
+            eager = time_calls(lambda: eager_reinforce(eager_model, tags, 1.0, datetime.now().timestamp()), 5)
+
+            lazy_model = seed_model(size, rng)
+            lazy = time_calls(lambda: lazy_model._reinforce(tags, 1.0, datetime.now().timestamp()), 200)
+            sweep = time_calls(lambda: lazy_model.prune(), 3)
+            print(f"{size:>10} | {eager:>17.3f} | {lazy:>16.4f} | {sweep:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Benchmark: step_by_step_solve, polynomial fast path vs simplify() + solve().
+# Run: python benchmark_equations.py
+import time
+import argparse
+import statistics
+
+import math_processor
+from math_processor import step_by_step_solve, parse_fraction_input, parse_cached, _step_by_step_solve_general
+from sympy import Eq
+
+CORPUS = [
+    "2x + 3 = 7", "5x - 2 = 3x + 8", "3(x - 4) = 2x + 1", "x/4 + 2 = 5", "1/2 x + 1/3 = 2",
+    "0.5x + 1.5 = 4", "7 - 2x = x + 1", "4x = 18", "2 3/4 x = 11", "6(x + 1) - 2 = 4x",
+    "x^2 - 5x + 6 = 0", "x^2 = 16", "2x^2 + 3x - 2 = 0", "x^2 + 4x + 4 = 0", "x^2 + 1 = 0",
+    "3x^2 - 12 = 0", "x(x - 3) = 10", "x^3 - 6x^2 + 11x - 6 = 0", "x^3 = 27", "x^4 - 5x^2 + 4 = 0",
+]
+
+
+def general(equation_str):
+    """The previous implementation: always simplify() + solve()."""
+    left, right = parse_fraction_input(equation_str).split("=")
+    left_expr, right_expr = parse_cached(left), parse_cached(right)
+    return _step_by_step_solve_general(Eq(left_expr, right_expr), left_expr - right_expr)
+
+
+def answer(output):
+    return output.split("🎯 Final Answer:")[-1].split("Now I want")[0].strip()
+
+
+def per_call_ms(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        math_processor.parse_cache.clear()  # every run starts cold, like a new question
+        start = time.perf_counter()
+        for eq in CORPUS:
+            fn(eq)
+        samples.append((time.perf_counter() - start) / len(CORPUS) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Equation solver fast path vs general solve")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    step_by_step_solve(CORPUS[0])  # warm SymPy imports/caches for both paths
+    general(CORPUS[0])
+
+    print(f"Corpus: {len(CORPUS)} equations")
+    for eq in CORPUS:
+        fast, slow = answer(step_by_step_solve(eq)), answer(general(eq))
+        if fast != slow:
+            print(f"   answers differ for {eq!r}: fast={fast} general={slow}")
+
+    slow_ms = per_call_ms(general, args.repeats)
+    fast_ms = per_call_ms(step_by_step_solve, args.repeats)
+    print(f"\n{'path':<30} {'per equation':>14}")
+    print(f"{'simplify + solve (before)':<30} {slow_ms:>11.2f} ms")
+    print(f"{'Poly fast path (after)':<30} {fast_ms:>11.2f} ms")
+    print(f"Speed-up: {slow_ms / fast_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# Benchmark: process_query latency (p50/p95/p99) and peak memory per math/science query class.
+# Run: python benchmark_math.py [--pool] [--warm] [--save [PATH]] [--compare PATH]
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+import sympy
+import math_processor
+from math_processor import process_query
+
+CORPUS = {
+    "arithmetic": [
+        "23 * 47", "999 * 999", "12 + 5 - 3", "(8 - 3) * (2 + 6)", "144 / 12", "2^10",
+        "1234 * 5678", "100 - 37 + 12",
+    ],
+    "fractions": [
+        "3/4 + 5/6", "1/3 + 1/6", "7/8 - 2/3", "(2/3) * (9/4)", "(5/6) / (10/3)", "1/2 + 1/3 + 1/4",
+    ],
+    "mixed_numbers": [
+        "2 3/4 + 1 1/2", "3 1/3 - 1 2/3", "1 1/2 * 2 2/3", "5 3/8 + 2 5/8", "4 1/4 - 2 7/8",
+    ],
+    "equations": [
+        "2x + 3 = 7", "5x - 2 = 3x + 8", "x/4 + 2 = 5", "x^2 - 5x + 6 = 0", "2x^2 + 3x - 2 = 0",
+        "x^2 + 1 = 0", "x^3 - 6x^2 + 11x - 6 = 0", "sin(x) = 1/2",
+    ],
+    "derivatives": [
+        "diff x^3 + 2x", "diff sin(x)*cos(x)", "diff exp(x^2)", "diff log(x)/x", "diff (x^2 + 1)^5",
+    ],
+    "integrals": [
+        "integrate x^2", "integrate x*sin(x)", "integrate exp(2x)", "integrate 1/(x^2 + 1)",
+        "integrate x*exp(x)",
+    ],
+    "limits": [
+        "limit sin(x)/x as x->0", "limit (1 + 1/n)**n as n->oo", "limit (x^2 - 1)/(x - 1) as x->1",
+        "limit (3*x + 1)/(x - 2) as x->oo",
+    ],
+    "plots": [
+        "plot x^2", "plot sin(x)", "plot 1/x", "plot x^3 - 3x", "plot exp(-x^2)",
+    ],
+    "science": [
+        "what is photosynthesis", "explain dna", "how does gravity work", "what is an atom",
+        "tell me about black holes", "what do mitochondria do",
+    ],
+}
+
+WOLFRAM_STUB = "🔎 (Wolfram Alpha is stubbed out for benchmarking)"
+wolfram_calls = []
+
+
+def stub_wolfram(question):
+    wolfram_calls.append(question)
+    return WOLFRAM_STUB
+
+
+class InlinePool:
+    """Stands in for the worker pool so SymPy runs here, where tracemalloc can see it."""
+    size = 1
+
+    def run(self, fn, *args, timeout=None):
+        return fn(*args)
+
+
+def clear_worker_caches():
+    math_processor.parse_cache.clear()
+
+
+def clear_caches(pool):
+    math_processor.result_cache.clear()
+    math_processor.parse_cache.clear()
+    if pool is not None:
+        for _ in range(pool.size):
+            pool.run(clear_worker_caches)  # idle workers are handed out FIFO, so this visits each one
+    for name in os.listdir(math_processor.GRAPH_DIR):
+        os.remove(os.path.join(math_processor.GRAPH_DIR, name))
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def ask(query_class, question):
+    mode = "science" if query_class == "science" else "math"
+    return process_query(question, mode=mode)
+
+
+def measure_latency(repeats, pool, warm):
+    samples = {name: [] for name in CORPUS}
+    ask("arithmetic", "1 + 1")  # first-call imports and worker start-up are not a query class
+    for _ in range(repeats):
+        if not warm:
+            clear_caches(pool)
+        for query_class, questions in CORPUS.items():
+            for question in questions:
+                start = time.perf_counter()
+                ask(query_class, question)
+                samples[query_class].append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def measure_memory(pool):
+    """Peak traced allocation (KiB) of the worst query in each class, from cold caches."""
+    clear_caches(pool)
+    peaks = {}
+    tracemalloc.start()
+    for query_class, questions in CORPUS.items():
+        peak = 0
+        for question in questions:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            ask(query_class, question)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        peaks[query_class] = peak / 1024
+    tracemalloc.stop()
+    return peaks
+
+
+def summarize(samples, peaks, fallbacks):
+    results = {}
+    for query_class, values in samples.items():
+        values = sorted(values)
+        results[query_class] = {
+            "queries": len(CORPUS[query_class]),
+            "samples": len(values),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+            "peak_kib": round(peaks[query_class], 1),
+            "wolfram_fallbacks": fallbacks.get(query_class, 0),
+        }
+    return results
+
+
+def print_table(results, baseline=None):
+    header = f"{'class':<14} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KiB':>10} {'wolfram':>8}"
+    if baseline:
+        header += f" {'p50 vs base':>12} {'p95 vs base':>12}"
+    print(header)
+    for query_class, row in results.items():
+        line = (f"{query_class:<14} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} "
+                f"{row['peak_kib']:>10.1f} {row['wolfram_fallbacks']:>8}")
+        base = (baseline or {}).get(query_class)
+        if base:
+            for key in ("p50_ms", "p95_ms"):
+                change = (row[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+                line += f" {change:>+11.0f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Math/science query latency and memory per query class")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--pool", action="store_true",
+                        help="go through the real worker pool (latency as users see it; memory then covers this process only)")
+    parser.add_argument("--warm", action="store_true", help="keep answer/parse caches between repeats")
+    parser.add_argument("--save", nargs="?", const="benchmark_math_baseline.json", metavar="PATH",
+                        help="write results as a JSON baseline (default: benchmark_math_baseline.json)")
+    parser.add_argument("--compare", metavar="PATH", help="show p50/p95 change against a saved baseline")
+    args = parser.parse_args()
+
+    # Wolfram is never called for real, and graphs go to a throwaway directory
+    math_processor.query_wolframalpha = stub_wolfram
+    graph_dir = tempfile.mkdtemp(prefix="benchmark_graphs_")
+    os.environ["GRAPH_DIR"] = graph_dir  # read by the workers when they import math_processor
+    math_processor.GRAPH_DIR = graph_dir
+    pool = math_processor.get_math_pool() if args.pool else None
+    if not args.pool:
+        math_processor.get_math_pool = lambda: InlinePool()
+
+    try:
+        samples = measure_latency(args.repeats, pool, args.warm)
+        fallbacks = {}
+        for query_class, questions in CORPUS.items():
+            canonical = {math_processor.canonical_question(q) for q in questions}
+            fallbacks[query_class] = sum(1 for q in set(wolfram_calls) if q in canonical)
+        peaks = measure_memory(pool)
+    finally:
+        shutil.rmtree(graph_dir, ignore_errors=True)
+
+    results = summarize(samples, peaks, fallbacks)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["classes"]
+
+    mode = "worker pool" if args.pool else "inline"
+    print(f"{sum(len(q) for q in CORPUS.values())} queries x {args.repeats} repeats, "
+          f"{mode}, {'warm' if args.warm else 'cold'} caches, Wolfram stubbed\n")
+    print_table(results, baseline)
+
+    if args.save:
+        report = {
+            "meta": {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "sympy": sympy.__version__,
+                "platform": sys.platform,
+                "mode": mode,
+                "caches": "warm" if args.warm else "cold",
+                "repeats": args.repeats,
+            },
+            "classes": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nBaseline saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Benchmark: memory log search latency as the history grows.
+# Run: python benchmark_memory_search.py [--max-size 1000000]
+import time
+import random
+import argparse
+import statistics
+
+from memory_search import SearchIndex, tokenize
+
+FILLER_WORDS = [f"word{i}" for i in range(5000)]
+COMMON_WORDS = ["today", "feel", "really", "think", "good", "work", "day", "time"]
+QUERIES = [
+    "when did I talk about my trip",        # selective term, fixed number of matches
+    "trip today",                           # selective term + very common term
+    "lighthouse birthday",                  # two selective terms
+]
+RARE_TOPICS = ["trip", "lighthouse", "birthday"]
+MATCHES_PER_TOPIC = 50
+
+
+def make_entry(rng, topic=None):
+    # Zipf-ish filler: low word ids are much more frequent than high ones
+    words = [FILLER_WORDS[int(rng.paretovariate(1.2)) % len(FILLER_WORDS)] for _ in range(8)]
+    words += rng.sample(COMMON_WORDS, 2)
+    if topic:
+        words.append(topic)
+    rng.shuffle(words)
+    return {"question": " ".join(words[:5]), "response": " ".join(words[5:])}
+
+
+def build_index(size, rng):
+    index = SearchIndex()
+    topic_positions = {topic: set(rng.sample(range(size), MATCHES_PER_TOPIC)) for topic in RARE_TOPICS}
+    for seq in range(size):
+        topic = next((t for t, positions in topic_positions.items() if seq in positions), None)
+        index.add(seq, make_entry(rng, topic))
+    return index
+
+
+def linear_scan(index_entries, query):
+    terms = set(tokenize(query))
+    return [e for e in index_entries if terms & set(tokenize(SearchIndex.entry_text(e)))]
+
+
+def time_query(index, query, repeats=50):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        index.search(query, k=10)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory log search benchmark")
+    parser.add_argument("--max-size", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    sizes = [s for s in (1_000, 10_000, 100_000, 1_000_000) if s <= args.max_size]
+    rng = random.Random(42)
+
+    print(f"{'entries':>10} | " + " | ".join(f"{q[:28]:>28}" for q in QUERIES) + " | build (s)")
+    for size in sizes:
+        start = time.perf_counter()
+        index = build_index(size, rng)
+        build_time = time.perf_counter() - start
+        timings = [time_query(index, q) for q in QUERIES]
+        print(f"{size:>10} | " + " | ".join(f"{t:>25.3f} ms" for t in timings) + f" | {build_time:.1f}")
+
+    # For contrast: what the old linear scan over _read_log() costs at a modest size
+    entries = [make_entry(rng, "trip" if i % 200 == 0 else None) for i in range(100_000)]
+    start = time.perf_counter()
+    linear_scan(entries, QUERIES[0])
+    print(f"\nLinear scan of 100000 entries: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Benchmark: reminder time parsing, fast grammar vs dateparser.
+# Run: python benchmark_time_parser.py
+import sys
+import time
+import subprocess
+import statistics
+
+from time_parser import parse_fast, parse_due_time, _compile_phrase
+
+CORPUS = [
+    "in 10 minutes", "in 5 mins", "in an hour", "in half an hour", "in 2 hours", "in 3 days",
+    "5 pm", "5pm", "at 7:30 pm", "10 am", "noon", "17:45",
+    "tomorrow", "tomorrow at 9", "tomorrow at 8:15am", "tonight", "today at 4pm",
+    "next monday", "monday at 8am", "on friday", "next friday at 6 pm",
+]
+
+
+def per_call_us(fn, phrases, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for phrase in phrases:
+            fn(phrase)
+        samples.append((time.perf_counter() - start) / len(phrases) * 1e6)
+    return statistics.median(samples)
+
+
+def import_time_ms(module):
+    code = f"import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip())
+
+
+def main():
+    import dateparser
+    settings = {"PREFER_DATES_FROM": "future"}
+
+    misses = [p for p in CORPUS if parse_fast(p) is None]
+    print(f"Corpus: {len(CORPUS)} phrases, fast-path misses: {misses or 'none'}\n")
+
+    _compile_phrase.cache_clear()
+    cold = per_call_us(lambda p: (_compile_phrase.cache_clear(), parse_fast(p)), CORPUS, 20)
+    warm = per_call_us(parse_fast, CORPUS, 200)
+    full = per_call_us(parse_due_time, CORPUS, 200)
+    slow = per_call_us(lambda p: dateparser.parse(p, settings=settings), CORPUS, 5)
+
+    print(f"{'path':<34} {'per call':>12}")
+    print(f"{'fast grammar, cold cache':<34} {cold:>9.1f} us")
+    print(f"{'fast grammar, warm LRU cache':<34} {warm:>9.1f} us")
+    print(f"{'parse_due_time (fast + fallback)':<34} {full:>9.1f} us")
+    print(f"{'dateparser.parse':<34} {slow:>9.1f} us")
+    print(f"\nImport time: time_parser {import_time_ms('time_parser'):.1f} ms, "
+          f"dateparser {import_time_ms('dateparser'):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
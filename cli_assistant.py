@@ -13,6 +13,13 @@ def sanitize_username(name: str) -> str:
     """Remove unwanted chars, keep only alphanumeric and underscore."""
     return re.sub(r'[^a-zA-Z0-9_]', '', name)
 
+def cli_intro_sequence(name, belief_model_factory=BeliefModel):
+    """Set up a user's reminder manager and memory logger; returns (user_name, memory_logger, reminder_manager)."""
+    user_name = sanitize_username(name) or "user"
+    reminder_manager = ReminderManager(user_name)
+    memory_logger = MemoryLogger(user_name, belief_model_factory(user_name))
+    return user_name, memory_logger, reminder_manager
+
 def run_cli_assistant():
     print("👋 Hello, I am your personal AI companion!")
     print("💡 Fun fact: AI stands for Artificial Intelligence.\n")
@@ -25,10 +32,8 @@ def run_cli_assistant():
     print("💡 Say or type 'modes' to see what I can do, or 'bye' to exit.\n")
 
     # Initialize your modules
-    reminder_manager = ReminderManager(user_name)
+    user_name, memory_logger, reminder_manager = cli_intro_sequence(user_name)
     reminder_manager.view_reminders()
-    belief_model = BeliefModel(user_name)
-    memory_logger = MemoryLogger(user_name, belief_model)
 
     while True:
         user_input = get_input("Say or type your command: ").strip().lower()
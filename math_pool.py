@@ -0,0 +1,166 @@
+import os
+import math
+import queue
+import atexit
+import threading
+import multiprocessing
+
+try:
+    import resource  # POSIX only; on Windows only the wall-clock timeout applies
+except ImportError:
+    resource = None
+
+
+class MathTimeout(Exception):
+    """The computation ran out of time or memory."""
+
+
+class MathBusy(Exception):
+    """No worker came free within the queue wait; the question itself may be easy."""
+
+
+class MathWorkerError(Exception):
+    """The computation raised in the worker (carries the original message)."""
+
+
+# --- Worker process ---
+def _limit_memory(memory_mb):
+    if resource and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _limit_cpu(seconds):
+    """Soft CPU limit = CPU used so far + this task's budget. Exceeding it raises SIGXCPU, which kills the worker."""
+    if resource and seconds:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = math.ceil(usage.ru_utime + usage.ru_stime + seconds)
+        hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn, memory_mb):
+    _limit_memory(memory_mb)
+    while True:
+        try:
+            fn, args, cpu_seconds = conn.recv()
+        except (EOFError, OSError):
+            break
+        _limit_cpu(cpu_seconds)
+        try:
+            conn.send(("ok", fn(*args)))
+        except MemoryError:
+            conn.send(("memory", "ran out of memory"))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class MathWorkerPool:
+    """
+    Warm, pre-started worker processes for untrusted SymPy work.
+
+    run(fn, *args) waits up to `queue_timeout` seconds for an idle worker
+    (MathBusy if none frees up), ships it a module-level function and waits
+    up to `timeout` seconds for the answer. Workers are started by a fork
+    server (spawn where there is none), never forked from the threaded web
+    process; `preload` modules are imported once in the fork server so new
+    workers start warm. Each worker has an address-space limit and a
+    per-task CPU limit (POSIX). A worker that times out or is killed by its
+    limits is terminated and replaced, and the caller gets MathTimeout, so
+    one pathological query never ties up a request thread or the server.
+    """
+
+    def __init__(self, size=2, timeout=8.0, memory_mb=1024, queue_timeout=30.0, preload=()):
+        self.size = size
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.memory_mb = memory_mb
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self._ctx = multiprocessing.get_context("forkserver")
+            self._ctx.set_forkserver_preload(list(preload))
+        else:
+            self._ctx = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(self._spawn())
+        atexit.register(self.close)
+
+    # --- Internal helpers ---
+    def _spawn(self):
+        parent_conn, child_conn = self._ctx.Pipe()
+        proc = self._ctx.Process(target=_worker_main, args=(child_conn, self.memory_mb), daemon=True)
+        proc.start()
+        child_conn.close()
+        worker = (proc, parent_conn)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _kill(self, worker):
+        proc, conn = worker
+        with self._lock:
+            self._workers.discard(worker)
+        proc.kill()
+        proc.join(timeout=1)
+        conn.close()
+
+    # --- Public methods ---
+    def run(self, fn, *args, timeout=None):
+        timeout = timeout or self.timeout
+        try:
+            worker = self._idle.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            raise MathBusy("all math workers are busy")
+
+        proc, conn = worker
+        try:
+            conn.send((fn, args, timeout))
+            if not conn.poll(timeout):
+                raise MathTimeout(f"gave up after {timeout:g}s")
+            status, value = conn.recv()
+        except (MathTimeout, EOFError, OSError) as e:
+            # Timed out, or the worker was killed by its CPU/memory limit: replace it
+            self._kill(worker)
+            worker = self._spawn() if not self._closed else None
+            raise e if isinstance(e, MathTimeout) else MathTimeout("worker hit its resource limit")
+        finally:
+            if worker is not None:
+                self._idle.put(worker)
+
+        if status == "memory":
+            raise MathTimeout(value)  # same outcome as a limit kill: too big to work out here
+        if status == "error":
+            raise MathWorkerError(value)
+        return value
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            self._kill(worker)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_math_pool():
+    """
+    Shared pool, started on first use (size/timeout/memory/queue wait from
+    MATH_WORKERS, MATH_TIMEOUT, MATH_MEMORY_MB, MATH_QUEUE_TIMEOUT).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MathWorkerPool(
+                size=int(os.getenv("MATH_WORKERS", 2)),
+                timeout=float(os.getenv("MATH_TIMEOUT", 8)),
+                memory_mb=int(os.getenv("MATH_MEMORY_MB", 1024)),
+                queue_timeout=float(os.getenv("MATH_QUEUE_TIMEOUT", 30)),
+                preload=["math_processor"],
+            )
+        return _pool
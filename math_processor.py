@@ -1,31 +1,206 @@
 import re
+import json
+import atexit
+import threading
+import hashlib
 import requests
-import matplotlib.pyplot as plt
 import numpy as np
-import uuid
 import os
+from collections import OrderedDict
 
 from sympy import (
     symbols, Eq, solve, diff, integrate, limit, simplify,
-    pretty, sympify, Rational
+    pretty, sympify, Rational, lambdify, srepr, Poly, sqrt
 )
+from sympy.polys.polyerrors import PolynomialError
 from sympy.parsing.sympy_parser import (
     parse_expr, standard_transformations,
     implicit_multiplication_application, convert_xor
 )
 from sympy.core.expr import Expr
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from dotenv import load_dotenv
-from fallback_explanations import handle_science_question_advanced
+from fallback_explanation import handle_science_question_advanced
+from math_pool import get_math_pool, MathTimeout, MathBusy
+from arithmetic_fast import arithmetic_steps_fast, arithmetic_step_stream
+from wolfram_cache import WolframCache
 
 # === Setup ===
 load_dotenv()
 WOLFRAM_APP_ID = os.getenv("WOLF_IFYKYK")
 
-GRAPH_DIR = "static/graphs"
+GRAPH_DIR = os.getenv("GRAPH_DIR", "static/graphs")
+GRAPH_DIR_MAX_BYTES = int(os.getenv("GRAPH_DIR_MAX_MB", 50)) * 1024 * 1024
+PLOT_RANGE = (-10, 10, 400)  # x min, x max, samples
 os.makedirs(GRAPH_DIR, exist_ok=True)
 
 transformations = standard_transformations + (implicit_multiplication_application, convert_xor)
 
+
+# === Parse / result caches ===
+class LRUCache:
+    """
+    Thread-safe LRU cache with an entry limit and an optional total character
+    budget (other values count as their JSON length). With file_path set, string entries are saved as JSON
+    (atomically, at exit and every `save_every` new entries) and reloaded on
+    start. hits/misses counters are exposed through stats().
+    """
+
+    def __init__(self, maxsize=1024, max_chars=None, file_path=None, save_every=50):
+        self.maxsize = maxsize
+        self.max_chars = max_chars
+        self.file_path = file_path
+        self.save_every = save_every
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._chars = 0
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if file_path:
+            self._load()
+            atexit.register(self.save)
+
+    # --- Internal helpers ---
+    def _size(self, value):
+        if isinstance(value, str):
+            return len(value)
+        if not self.max_chars:
+            return 0  # no budget to charge against (e.g. parsed SymPy trees)
+        return len(json.dumps(value, default=str))
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return
+        for key, value in entries:
+            self.put(key, value, persist=False)
+
+    def _evict(self):
+        while self._data and (len(self._data) > self.maxsize or
+                              (self.max_chars and self._chars > self.max_chars)):
+            _, value = self._data.popitem(last=False)
+            self._chars -= self._size(value)
+
+    # --- Public methods ---
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, persist=True):
+        with self._lock:
+            if key in self._data:
+                self._chars -= self._size(self._data.pop(key))
+            self._data[key] = value
+            self._chars += self._size(value)
+            self._evict()
+            self._unsaved += persist
+            save_now = self.file_path and self._unsaved >= self.save_every
+        if save_now:
+            self.save()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "chars": self._chars,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def save(self):
+        if not self.file_path:
+            return
+        with self._lock:
+            entries = [[k, v] for k, v in self._data.items() if isinstance(v, str)]
+            self._unsaved = 0
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.file_path)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._chars = 0
+
+
+# Rendered answers, keyed by canonical question (MATH_CACHE_FILE enables persistence)
+result_cache = LRUCache(
+    maxsize=int(os.getenv("MATH_CACHE_SIZE", 2048)),
+    max_chars=int(os.getenv("MATH_CACHE_CHARS", 8_000_000)),
+    file_path=os.getenv("MATH_CACHE_FILE") or None,
+)
+# Parsed SymPy expressions; one per process, so each math worker keeps its own
+parse_cache = LRUCache(maxsize=1024)
+
+_COMMAND_RE = re.compile(r'^(diff|integrate|limit|plot)\b', re.IGNORECASE)
+
+
+def canonical_question(question: str) -> str:
+    """
+    Cache key for a question: powers as **, whitespace collapsed, no spaces
+    around + - * = or just inside ( ), and a lower-case leading command.
+    Spaces next to digits and "/" are kept because "23 7" and "2 3/4" depend
+    on them, and so are spaces outside parentheses ("limit (...) as x->0").
+    """
+    q = re.sub(r'\s+', ' ', question.strip().replace("^", "**"))
+    q = re.sub(r'\s*([+\-*=])\s*', r'\1', q)
+    q = re.sub(r'\(\s+', '(', re.sub(r'\s+\)', ')', q))
+    return _COMMAND_RE.sub(lambda m: m.group(1).lower(), q)
+
+
+def parse_cached(expr_str: str, evaluate=True):
+    """parse_expr with this module's transformations, memoized (SymPy expressions are immutable)."""
+    key = (expr_str.strip(), evaluate)
+    expr = parse_cache.get(key)
+    if expr is None:
+        expr = parse_expr(key[0], transformations=transformations, evaluate=evaluate)
+        parse_cache.put(key, expr)
+    return expr
+
+
+# parse_cache counters of each math worker (by pid), as last reported with a result
+_worker_parse_stats = {}
+
+
+def _run_reporting_stats(fn, *args):
+    """Runs in a math worker: fn's result plus this worker's parse-cache counters."""
+    return fn(*args), os.getpid(), parse_cache.stats()
+
+
+def run_in_math_pool(fn, *args):
+    """get_math_pool().run(fn, *args), keeping the workers' parse-cache counters up to date."""
+    value, pid, stats = get_math_pool().run(_run_reporting_stats, fn, *args)
+    _worker_parse_stats[pid] = stats
+    return value
+
+
+def _parse_stats():
+    """parse_cache counters summed over the math workers (parsing happens there)."""
+    reports = list(_worker_parse_stats.values())
+    totals = {key: sum(r[key] for r in reports) for key in ("entries", "chars", "hits", "misses")}
+    lookups = totals["hits"] + totals["misses"]
+    totals["hit_rate"] = round(totals["hits"] / lookups, 3) if lookups else 0.0
+    totals["workers"] = len(reports)
+    return totals
+
+
+def math_cache_stats():
+    return {"results": result_cache.stats(), "parsed": _parse_stats(), "wolfram": wolfram_cache.stats()}
+
 # === Helpers ===
 def format_number(val, fraction_mode=False):
     if fraction_mode:
@@ -58,8 +233,8 @@ def parse_fraction_input(expr_str: str):
     return mixed_number_re.sub(convert_mixed, expr_str)
 
 # === Wolfram Alpha Query ===
-def query_wolframalpha(question: str) -> str:
-    """Fallback for complex queries using Wolfram Alpha"""
+def fetch_wolframalpha(question: str) -> str:
+    """One uncached Wolfram Alpha API call."""
     url = "http://api.wolframalpha.com/v2/query"
     params = {"input": question, "appid": WOLFRAM_APP_ID, "format": "plaintext"}
     try:
@@ -69,356 +244,728 @@ def query_wolframalpha(question: str) -> str:
     except Exception as e:
         return f"⚠️ Wolfram Alpha error: {e}"
 
+
+_WOLFRAM_RESULT_RE = re.compile(r"<queryresult\b([^>]*)>")
+
+
+def wolfram_succeeded(answer: str) -> bool:
+    """
+    True only for a real result: <queryresult success='true' error='false'>.
+    Wolfram returns HTTP 200 for its own failures too (bad appid, no result),
+    and those must not be cached for a week.
+    """
+    match = _WOLFRAM_RESULT_RE.search(answer)
+    if not match:
+        return False
+    attrs = match.group(1)
+    return (re.search(r"""\bsuccess=['"]true['"]""", attrs) is not None
+            and re.search(r"""\berror=['"]true['"]""", attrs) is None)
+
+
+wolfram_cache = WolframCache(
+    fetch_wolframalpha,
+    ttl=float(os.getenv("WOLFRAM_CACHE_TTL", 7 * 86400)),
+    is_cacheable=wolfram_succeeded,
+)
+
+
+def query_wolframalpha(question: str) -> str:
+    """Fallback for complex queries using Wolfram Alpha (cached on disk, concurrent misses coalesced)"""
+    return wolfram_cache.get(question)
+
 # === Step-by-step arithmetic solver  ===
 def step_by_step_arithmetic_full(expr_str: str, fraction_mode=False) -> str:
     """
     Conversational, scaffolded arithmetic tutor with reflective thought bubbles.
+    Plain numbers take the exact Fraction fast path; anything else uses SymPy.
     """
+    fast = arithmetic_steps_fast(expr_str, fraction_mode)
+    if fast is not None:
+        return fast
+    return step_by_step_arithmetic_sympy(expr_str, fraction_mode)
 
+
+def step_by_step_arithmetic_sympy(expr_str: str, fraction_mode=False) -> str:
+    """SymPy tree walk for arithmetic the fast path does not cover (roots, huge powers)."""
     try:
-        expr_str = fix_implicit_multiplication(expr_str)
-        expr_str = parse_fraction_input(expr_str)
-        expr = parse_expr(expr_str, transformations=transformations, evaluate=False)
-
-        steps = []
-
-        # -----------------------------------------
-        # Messaging Helpers
-        # -----------------------------------------
-        def add_step(msg):
-            steps.append(msg)
-
-        def thought(msg):
-            steps.append(f"💭 Pause & Think: {msg}")
-
-        def coach(msg):
-            steps.append(f"🧠 Strategy: {msg}")
-
-        # -----------------------------------------
-        # Intro
-        # -----------------------------------------
-        add_step(f"🟢 Let's solve this together:\n   {expr_str}")
-        add_step("We’ll move slowly and make sure each idea actually makes sense.")
-
-        # -----------------------------------------
-        # Utility: Place-Value Decomposition
-        # -----------------------------------------
-        def decompose_number(n):
-            parts = []
-            place = 1
-            while n > 0:
-                digit = n % 10
-                if digit != 0:
-                    parts.append(digit * place)
-                n //= 10
-                place *= 10
-            return list(reversed(parts))
-
-        # -----------------------------------------
-        # Multiplication Handler
-        # -----------------------------------------
-        def handle_multiplication(e):
-            add_step(f"\n🔎 We see multiplication → {e}")
-            thought("Can any of these numbers be broken into easier parts?")
-
-            # Distribution case
-            if any(arg.is_Add for arg in e.args):
-                coach("When multiplication touches parentheses, we distribute.")
-
-                thought("What does multiplying across a sum remind you of?")
-
-                distributed_terms = []
-                for arg in e.args:
-                    if arg.is_Add:
-                        other_factors = [a for a in e.args if a != arg]
-                        for term in arg.args:
-                            new_expr = term
-                            for factor in other_factors:
-                                new_expr *= factor
-                            distributed_terms.append(new_expr)
-
-                expanded = sum(distributed_terms)
-
-                add_step(f"🪜 After distributing:\n   {expanded}")
-                thought("Why does distributing preserve the total value?")
-                return walk(expanded)
-
-            # Pure numbers
-            if all(arg.is_Number for arg in e.args):
-                nums = [int(a) for a in e.args]
-
-                # Exactly 2 numbers
-                if len(nums) == 2:
-                    a, b = nums
-                    digits_a = len(str(abs(a)))
-                    digits_b = len(str(abs(b)))
-
-                    # Single-digit × single-digit
-                    if digits_a == 1 and digits_b == 1:
-                        coach("Both are single digits — direct multiplication.")
-                        result = a * b
-                        add_step(f"   {a} × {b} = {result}")
-                        thought("Does that match any ideas that you already know?")
-                        return format_number(result, fraction_mode)
-
-                    # Multi-digit × single-digit
-                    if digits_a > 1 and digits_b == 1:
-                        coach("Break the larger number using place value.")
-
-                        parts = decompose_number(a)
-                        add_step(f"   {a} = {' + '.join(map(str, parts))}")
-
-                        thought("Why is breaking by place value helpful here?")
-
-                        partials = []
-                        for p in parts:
-                            val = p * b
-                            partials.append(val)
-                            add_step(f"   {p} × {b} = {val}")
-
-                        total = sum(partials)
-                        add_step(f"➕ Add partial products:")
-                        add_step(f"   {' + '.join(map(str, partials))} = {total}")
-
-                        thought("Why does adding these give the answer we want?")
-                        return format_number(total, fraction_mode)
-
-                    # Multi-digit × multi-digit
-                    coach("Break BOTH numbers (area model thinking).")
-
-                    parts_a = decompose_number(a)
-                    parts_b = decompose_number(b)
-
-                    add_step(f"   {a} = {' + '.join(map(str, parts_a))}")
-                    add_step(f"   {b} = {' + '.join(map(str, parts_b))}")
-
-                    thought("How many smaller multiplications will we create?")
+        return "\n".join(sympy_arithmetic_steps(expr_str, fraction_mode))
+    except MemoryError:
+        raise  # reported by the math worker, so the caller can fall back
+    except Exception as e:
+        return f"⚠️ Unable to process your math problem: {e}"
+
+
+def sympy_arithmetic_steps(expr_str: str, fraction_mode=False):
+    """Generator behind step_by_step_arithmetic_sympy: yields each step as soon as it is worked out."""
+    expr_str = parse_fraction_input(expr_str)  # before "2 3" -> "2*3", so mixed numbers survive
+    expr_str = fix_implicit_multiplication(expr_str)
+    expr = parse_cached(expr_str, evaluate=False)
+
+    # -----------------------------------------
+    # Messaging Helpers
+    # -----------------------------------------
+    def thought(msg):
+        return f"💭 Pause & Think: {msg}"
+
+    def coach(msg):
+        return f"🧠 Strategy: {msg}"
+
+    # -----------------------------------------
+    # Intro
+    # -----------------------------------------
+    yield f"🟢 Let's solve this together:\n   {expr_str}"
+    yield "We’ll move slowly and make sure each idea actually makes sense."
+
+    # -----------------------------------------
+    # Utility: Place-Value Decomposition
+    # -----------------------------------------
+    def decompose_number(n):
+        parts = []
+        place = 1
+        while n > 0:
+            digit = n % 10
+            if digit != 0:
+                parts.append(digit * place)
+            n //= 10
+            place *= 10
+        return list(reversed(parts))
+
+    # -----------------------------------------
+    # Multiplication Handler
+    # -----------------------------------------
+    def handle_multiplication(e):
+        yield f"\n🔎 We see multiplication → {e}"
+        yield thought("Can any of these numbers be broken into easier parts?")
+
+        # Distribution case
+        if any(arg.is_Add for arg in e.args):
+            yield coach("When multiplication touches parentheses, we distribute.")
+
+            yield thought("What does multiplying across a sum remind you of?")
+
+            distributed_terms = []
+            for arg in e.args:
+                if arg.is_Add:
+                    other_factors = [a for a in e.args if a != arg]
+                    for term in arg.args:
+                        new_expr = term
+                        for factor in other_factors:
+                            new_expr *= factor
+                        distributed_terms.append(new_expr)
+
+            expanded = sum(distributed_terms)
+
+            yield f"🪜 After distributing:\n   {expanded}"
+            yield thought("Why does distributing preserve the total value?")
+            return (yield from walk(expanded))
+
+        # Pure numbers
+        if all(arg.is_Number for arg in e.args):
+            nums = [int(a) for a in e.args]
+
+            # Exactly 2 numbers
+            if len(nums) == 2:
+                a, b = nums
+                digits_a = len(str(abs(a)))
+                digits_b = len(str(abs(b)))
+
+                # Single-digit × single-digit
+                if digits_a == 1 and digits_b == 1:
+                    yield coach("Both are single digits — direct multiplication.")
+                    result = a * b
+                    yield f"   {a} × {b} = {result}"
+                    yield thought("Does that match any ideas that you already know?")
+                    return format_number(result, fraction_mode)
+
+                # Multi-digit × single-digit
+                if digits_a > 1 and digits_b == 1:
+                    yield coach("Break the larger number using place value.")
+
+                    parts = decompose_number(a)
+                    yield f"   {a} = {' + '.join(map(str, parts))}"
+
+                    yield thought("Why is breaking by place value helpful here?")
 
                     partials = []
-                    for pa in parts_a:
-                        for pb in parts_b:
-                            val = pa * pb
-                            partials.append(val)
-                            add_step(f"   {pa} × {pb} = {val}")
+                    for p in parts:
+                        val = p * b
+                        partials.append(val)
+                        yield f"   {p} × {b} = {val}"
 
                     total = sum(partials)
-                    add_step("➕ Add all partial products:")
-                    add_step(f"   {' + '.join(map(str, partials))} = {total}")
+                    yield f"➕ Add partial products:"
+                    yield f"   {' + '.join(map(str, partials))} = {total}"
 
-                    thought("Does this result seem reasonable compared to jus estimating it")
+                    yield thought("Why does adding these give the answer we want?")
                     return format_number(total, fraction_mode)
 
-                # More than 2 numbers
-                coach("Multiply step-by-step from left to right.")
-                current = nums[0]
-
-                for n in nums[1:]:
-                    thought(f"What happens when we multiply {current} by {n}?")
-                    add_step(f"   {current} × {n}")
-                    current *= n
-
-                add_step(f"✖️ Final result = {current}")
-                return format_number(current, fraction_mode)
-
-            # Mixed symbolic
-            coach("Evaluate each factor first, then combine.")
-            values = [walk(arg) for arg in e.args]
+                # Multi-digit × multi-digit
+                yield coach("Break BOTH numbers (area model thinking).")
+
+                parts_a = decompose_number(a)
+                parts_b = decompose_number(b)
+
+                yield f"   {a} = {' + '.join(map(str, parts_a))}"
+                yield f"   {b} = {' + '.join(map(str, parts_b))}"
+
+                yield thought("How many smaller multiplications will we create?")
+
+                partials = []
+                for pa in parts_a:
+                    for pb in parts_b:
+                        val = pa * pb
+                        partials.append(val)
+                        yield f"   {pa} × {pb} = {val}"
+
+                total = sum(partials)
+                yield "➕ Add all partial products:"
+                yield f"   {' + '.join(map(str, partials))} = {total}"
+
+                yield thought("Does this result seem reasonable compared to jus estimating it")
+                return format_number(total, fraction_mode)
+
+            # More than 2 numbers
+            yield coach("Multiply step-by-step from left to right.")
+            current = nums[0]
+
+            for n in nums[1:]:
+                yield thought(f"What happens when we multiply {current} by {n}?")
+                yield f"   {current} × {n}"
+                current *= n
+
+            yield f"✖️ Final result = {current}"
+            return format_number(current, fraction_mode)
+
+        # Mixed symbolic
+        yield coach("Evaluate each factor first, then combine.")
+        values = []
+        for arg in e.args:
+            values.append((yield from walk(arg)))
+        result = format_number(e.evalf(), fraction_mode)
+        yield f"✖️ Combine → {' × '.join(values)} = {result}"
+        return result
+
+    # -----------------------------------------
+    # Addition Handler
+    # -----------------------------------------
+    def handle_addition(e):
+        yield f"\n🔎 I see addition/subtraction → {e}"
+        yield thought("Should we evaluate any parts first before combining?")
+
+        values = []
+        for arg in e.args:
+            values.append((yield from walk(arg)))
+        result = format_number(e.evalf(), fraction_mode)
+
+        yield f"➕ Combine:"
+        yield f"   {' + '.join(values)} = {result}"
+
+        yield thought("Is the final number larger or smaller than the biggest addend?")
+        return result
+
+    # -----------------------------------------
+    # Power Handler
+    # -----------------------------------------
+    def handle_power(e):
+        base_v = yield from walk(e.base)
+        exp_v = yield from walk(e.exp)
+
+        yield f"\n🔎 Exponent detected → {base_v}^{exp_v}"
+        yield thought("What does an exponent represent conceptually?")
+
+        if e.exp.is_Integer and e.exp > 1:
+            yield coach(f"Multiply {base_v} by itself {e.exp} times.")
             result = format_number(e.evalf(), fraction_mode)
-            add_step(f"✖️ Combine → {' × '.join(values)} = {result}")
+            yield f"   Result = {result}"
             return result
 
-        # -----------------------------------------
-        # Addition Handler
-        # -----------------------------------------
-        def handle_addition(e):
-            add_step(f"\n🔎 I see addition/subtraction → {e}")
-            thought("Should we evaluate any parts first before combining?")
-
-            values = [walk(arg) for arg in e.args]
+        if e.exp.is_Number and e.exp < 0:
+            yield coach("Negative exponent → take reciprocal.")
             result = format_number(e.evalf(), fraction_mode)
-
-            add_step(f"➕ Combine:")
-            add_step(f"   {' + '.join(values)} = {result}")
-
-            thought("Is the final number larger or smaller than the biggest addend?")
+            yield f"   Result = {result}"
             return result
 
-        # -----------------------------------------
-        # Power Handler
-        # -----------------------------------------
-        def handle_power(e):
-            base_v = walk(e.base)
-            exp_v = walk(e.exp)
-
-            add_step(f"\n🔎 Exponent detected → {base_v}^{exp_v}")
-            thought("What does an exponent represent conceptually?")
-
-            if e.exp.is_Integer and e.exp > 1:
-                coach(f"Multiply {base_v} by itself {e.exp} times.")
-                result = format_number(e.evalf(), fraction_mode)
-                add_step(f"   Result = {result}")
-                return result
-
-            if e.exp.is_Number and e.exp < 0:
-                coach("Negative exponent → take reciprocal.")
-                result = format_number(e.evalf(), fraction_mode)
-                add_step(f"   Result = {result}")
-                return result
-
-            if e.exp == Rational(1, 2):
-                coach("Exponent of 1/2 means square root.")
-                result = format_number(e.evalf(), fraction_mode)
-                add_step(f"   √{base_v} = {result}")
-                return result
-
+        if e.exp == Rational(1, 2):
+            yield coach("Exponent of 1/2 means square root.")
             result = format_number(e.evalf(), fraction_mode)
-            add_step(f"   Result = {result}")
+            yield f"   √{base_v} = {result}"
             return result
 
-        # -----------------------------------------
-        # Recursive Walker
-        # -----------------------------------------
-        def walk(e: Expr) -> str:
-
-            if isinstance(e, Rational):
-                return format_number(e, fraction_mode)
+        result = format_number(e.evalf(), fraction_mode)
+        yield f"   Result = {result}"
+        return result
 
-            if e.is_Number:
-                return format_number(e, fraction_mode)
+    # -----------------------------------------
+    # Recursive Walker
+    # -----------------------------------------
+    def walk(e: Expr):
 
-            if e.is_Add:
-                return handle_addition(e)
+        if isinstance(e, Rational):
+            return format_number(e, fraction_mode)
 
-            if e.is_Mul:
-                return handle_multiplication(e)
+        if e.is_Number:
+            return format_number(e, fraction_mode)
 
-            if e.is_Pow:
-                return handle_power(e)
+        if e.is_Add:
+            return (yield from handle_addition(e))
 
-            num, denom = e.as_numer_denom()
-            if denom != 1:
-                add_step("\n🔎 Division detected.")
-                thought("Division can be thought of as splitting or fractions.")
+        if e.is_Mul:
+            return (yield from handle_multiplication(e))
 
-                num_v = walk(num)
-                denom_v = walk(denom)
+        if e.is_Pow:
+            return (yield from handle_power(e))
 
-                result = format_number(e.evalf(), fraction_mode)
-                add_step(f"➗ {num_v} ÷ {denom_v} = {result}")
+        num, denom = e.as_numer_denom()
+        if denom != 1:
+            yield "\n🔎 Division detected."
+            yield thought("Division can be thought of as splitting or fractions.")
 
-                thought("Does this quotient make sense in size?")
-                return result
+            num_v = yield from walk(num)
+            denom_v = yield from walk(denom)
 
             result = format_number(e.evalf(), fraction_mode)
-            add_step(f"🔹 Simplified result = {result}")
-            return result
+            yield f"➗ {num_v} ÷ {denom_v} = {result}"
 
-        final_result = walk(expr)
+            yield thought("Does this quotient make sense in size?")
+            return result
 
-        add_step("\n🎯 Final Answer:")
-        add_step(f"   {final_result}")
+        result = format_number(e.evalf(), fraction_mode)
+        yield f"🔹 Simplified result = {result}"
+        return result
 
-        thought("Could you explain one of the steps in your own words?")
-        add_step("That’s how you lock understanding in.")
+    final_result = yield from walk(expr)
 
-        return "\n".join(steps)
+    yield "\n🎯 Final Answer:"
+    yield f"   {final_result}"
 
-    except Exception as e:
-        return f"⚠️ Unable to process your math problem: {e}"
+    yield thought("Could you explain one of the steps in your own words?")
+    yield "That’s how you lock understanding in."
 
 
 # === Equation solver ===
+MAX_FAST_DEGREE = 4
+
+
+def _format_root(root):
+    value = root.evalf()
+    if value.is_real:
+        return format_number(value)
+    re_part, im_part = value.as_real_imag()
+    if re_part == 0:
+        return f"{format_number(im_part)}i"
+    return f"{format_number(re_part)} {'+' if im_part >= 0 else '-'} {format_number(abs(im_part))}i"
+
+
+def _coef(value):
+    """Coefficient for display: exact numbers as-is, floats without SymPy's 15 digits."""
+    return format_number(float(value)) if value.is_Float else str(value)
+
+
+def _polynomial_steps(var, poly):
+    """Method steps and roots for a polynomial equation, without simplify() or solve()."""
+    degree = poly.degree()
+    coeffs = poly.all_coeffs()
+
+    if degree == 1:
+        a, b = coeffs
+        root = -b / a
+        steps = [
+            f"🔍 Step 4: Identify the type\n   Linear equation: {_coef(a)}·{var} + ({_coef(b)}) = 0",
+            f"✏️ Step 5: Isolate {var}\n   {_coef(a)}·{var} = {_coef(-b)}\n"
+            f"   {var} = {_coef(-b)} ÷ {_coef(a)} = {_coef(root)}",
+        ]
+        return steps, [root]
+
+    if degree == 2:
+        a, b, c = coeffs
+        disc = b ** 2 - 4 * a * c
+        a_s, b_s, c_s, disc_s = _coef(a), _coef(b), _coef(c), _coef(disc)
+        steps = [
+            f"🔍 Step 4: Identify the type\n   Quadratic equation: a = {a_s}, b = {b_s}, c = {c_s}",
+            f"🧮 Step 5: Discriminant\n   b² - 4ac = ({b_s})² - 4·({a_s})·({c_s}) = {disc_s}",
+        ]
+        if disc == 0:
+            roots = [-b / (2 * a)]
+            steps.append(f"✏️ Step 6: One repeated root\n   {var} = -b / 2a = {_coef(roots[0])}")
+        else:
+            roots = [(-b - sqrt(disc)) / (2 * a), (-b + sqrt(disc)) / (2 * a)]
+            kind = "two real roots" if disc > 0 else "no real roots, two complex roots"
+            steps.append(f"✏️ Step 6: Quadratic formula ({kind})\n   {var} = (-b ± √{disc_s}) / 2a")
+        return steps, roots
+
+    # Degree 3-4: rational roots exactly, the rest numerically
+    roots = sorted(poly.nroots(), key=lambda r: (not r.is_real, float(r.as_real_imag()[0])))
+    steps = [
+        f"🔍 Step 4: Identify the type\n   Polynomial of degree {degree}",
+        f"✏️ Step 5: Find the roots of\n   {pretty(poly.as_expr())} = 0",
+    ]
+    return steps, roots
+
+
 def step_by_step_solve(equation_str: str) -> str:
+    """
+    Solve an equation with steps. Linear, quadratic and low-degree polynomial
+    equations in one variable use closed forms / Poly roots; anything else
+    goes through simplify() + solve().
+    """
     try:
         equation_str = parse_fraction_input(equation_str)
         left, right = equation_str.split('=')
-        left_expr = parse_expr(left, transformations=transformations)
-        right_expr = parse_expr(right, transformations=transformations)
+        left_expr = parse_cached(left)
+        right_expr = parse_cached(right)
         equation = Eq(left_expr, right_expr)
-        var = list(equation.free_symbols)[0]
-
         rearranged = left_expr - right_expr
-        simplified = simplify(rearranged)
-        solutions = solve(simplified, var)
-        formatted = [format_number(s.evalf()) for s in solutions]
-
-        return "\n\n".join([
-            f"🟢 Step 1: Original Equation\n   {pretty(equation)} which we want to evaluate is {formatted[0]}",
-            f"🔄 Step 2: Move all terms to one side\n   {pretty(rearranged)} = 0",
-            f"🧹 Step 3: Simplify\n   {pretty(simplified)} = 0",
-            f"🎯 Final Answer:\n   {var} = {', '.join(formatted)} Now I want you to give it a try! "
-        ])
+
+        if len(rearranged.free_symbols) == 1:
+            var = next(iter(rearranged.free_symbols))
+            try:
+                poly = Poly(rearranged, var)
+            except PolynomialError:
+                poly = None
+            if poly is not None and 1 <= poly.degree() <= MAX_FAST_DEGREE and poly.domain.is_Numerical:
+                method_steps, roots = _polynomial_steps(var, poly)
+                formatted = [_format_root(r) for r in roots]
+                return "\n\n".join([
+                    f"🟢 Step 1: Original Equation\n   {pretty(equation)} which we want to evaluate is {formatted[0]}",
+                    f"🔄 Step 2: Move all terms to one side\n   {pretty(rearranged)} = 0",
+                    f"🧹 Step 3: Simplify\n   {pretty(poly.as_expr())} = 0",
+                    *method_steps,
+                    f"🎯 Final Answer:\n   {var} = {', '.join(formatted)} Now I want you to give it a try! "
+                ])
+
+        return _step_by_step_solve_general(equation, rearranged)
+    except MemoryError:
+        raise
     except Exception as e:
         return f"⚠️ Couldn't solve equation: {e}"
 
+
+def _step_by_step_solve_general(equation, rearranged) -> str:
+    var = list(equation.free_symbols)[0]
+    simplified = simplify(rearranged)
+    solutions = solve(simplified, var)
+    formatted = [_format_root(s) for s in solutions]
+
+    return "\n\n".join([
+        f"🟢 Step 1: Original Equation\n   {pretty(equation)} which we want to evaluate is {formatted[0]}",
+        f"🔄 Step 2: Move all terms to one side\n   {pretty(rearranged)} = 0",
+        f"🧹 Step 3: Simplify\n   {pretty(simplified)} = 0",
+        f"🎯 Final Answer:\n   {var} = {', '.join(formatted)} Now I want you to give it a try! "
+    ])
+
 # === Graphing with Matplotlib + SymPy ===
+def parse_plot_expression(expr_str: str):
+    """'plot x^2 - 3' -> (x, parsed expression)."""
+    expr_str = expr_str.lower().replace('plot', '').replace('^', '**').strip()
+    x = symbols('x')
+    return x, parse_cached(expr_str)
+
+
+def compile_expression(x, expr):
+    """
+    Lambdify expr once; the returned function evaluates it over a NumPy array
+    in one vectorized call, with undefined points as NaN.
+    """
+    f = lambdify(x, expr, "numpy")
+
+    def evaluate(x_vals):
+        with np.errstate(all="ignore"):
+            y_vals = np.asarray(f(x_vals))
+        if y_vals.shape != x_vals.shape:
+            y_vals = np.broadcast_to(y_vals, x_vals.shape)  # constant expressions
+        if np.iscomplexobj(y_vals):
+            y_vals = np.where(np.abs(y_vals.imag) < 1e-12, y_vals.real, np.nan)
+        return y_vals.astype(float)
+    return evaluate
+
+
+def sample_expression(x, expr, x_vals):
+    """Evaluate expr over a NumPy array in one vectorized call; undefined points become NaN."""
+    return compile_expression(x, expr)(x_vals)
+
+
+def _evict_graphs(keep):
+    """Least-recently-used eviction: drop the oldest PNGs until GRAPH_DIR fits its size cap."""
+    graphs = []
+    for entry in os.scandir(GRAPH_DIR):
+        if entry.name.endswith(".png") and entry.path != keep:
+            stat = entry.stat()
+            graphs.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in graphs) + os.path.getsize(keep)
+    for _, size, path in sorted(graphs):
+        if total <= GRAPH_DIR_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except FileNotFoundError:
+            pass  # another worker got there first
+
+
 def plot_expression(expr_str: str) -> str:
     try:
-        expr_str = expr_str.lower().replace('plot', '').replace('^', '**').strip()
-        x = symbols('x')
-        expr = parse_expr(expr_str, transformations=transformations)
-        x_vals = np.linspace(-10, 10, 400)
-        y_vals = [float(expr.subs(x, v)) for v in x_vals]
-
-        filename = f"{uuid.uuid4().hex}.png"
-        path = os.path.join(GRAPH_DIR, filename)
-        plt.plot(x_vals, y_vals)
-        plt.grid(True)
-        plt.savefig(path)
-        plt.close()
+        x, expr = parse_plot_expression(expr_str)
+
+        # Content-addressed: the same curve always maps to the same file
+        digest = hashlib.sha1(f"{srepr(expr)}|{PLOT_RANGE}".encode("utf-8")).hexdigest()[:20]
+        path = os.path.join(GRAPH_DIR, f"{digest}.png")
+        if os.path.exists(path):
+            os.utime(path)  # mark as recently used
+            return f"🖼 [View graph]({path})"
+
+        x_vals = np.linspace(*PLOT_RANGE)
+        y_vals = sample_expression(x, expr, x_vals)
+
+        # Object-oriented Agg figure: no pyplot global state shared between requests
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.plot(x_vals, y_vals)
+        ax.grid(True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.png"
+        fig.savefig(tmp_path)
+        os.replace(tmp_path, path)
+
+        _evict_graphs(keep=path)
         return f"🖼 [View graph]({path})"
+    except MemoryError:
+        raise
     except Exception as e:
         return f"⚠️ Graph error: {e}"
 
+# === Plot data (JSON) with adaptive sampling ===
+PLOT_POINT_BUDGET = 600
+
+
+def _robust_scale(ys):
+    finite = ys[np.isfinite(ys)]
+    if finite.size < 2:
+        return 1.0
+    lo, hi = np.percentile(finite, [5, 95])
+    return float(hi - lo) or float(np.abs(finite).max()) or 1.0
+
+
+def adaptive_sample(f, x_min, x_max, max_points=PLOT_POINT_BUDGET, initial=65, tolerance=0.002, max_passes=12):
+    """
+    Sample f on [x_min, x_max], bisecting the intervals where the curve bends
+    away from a straight line (or crosses the edge of its domain) until the
+    error is below `tolerance` (relative to the curve's spread) or the
+    point budget runs out. Each pass is one vectorized evaluation.
+    """
+    xs = np.linspace(x_min, x_max, initial)
+    ys = f(xs)
+    for _ in range(max_passes):
+        budget = max_points - len(xs)
+        if budget <= 0:
+            break
+        mids = (xs[:-1] + xs[1:]) / 2
+        y_mid = f(mids)
+        with np.errstate(all="ignore"):
+            err = np.abs(y_mid - (ys[:-1] + ys[1:]) / 2) / _robust_scale(ys)
+
+        defined = np.isfinite(np.stack([ys[:-1], ys[1:], y_mid]))
+        err[~defined.all(axis=0)] = 0.0
+        err[defined.any(axis=0) & ~defined.all(axis=0)] = np.inf  # domain edge: narrow it down
+        refine = np.flatnonzero(err > tolerance)
+        if refine.size == 0:
+            break
+        if refine.size > budget:
+            refine = np.sort(refine[np.argsort(-err[refine])[:budget]])
+        xs = np.insert(xs, refine + 1, mids[refine])
+        ys = np.insert(ys, refine + 1, y_mid[refine])
+    return xs, ys
+
+
+def _find_breaks(f, xs, ys, scale, iterations=30):
+    """
+    Intervals where the curve is discontinuous. A large step is bisected
+    toward its steeper half; a continuous curve's step shrinks with the
+    width, while a jump or an asymptote (1/x, tan x) keeps it.
+    """
+    with np.errstate(all="ignore"):
+        steps = np.abs(np.diff(ys))
+    undefined = ~(np.isfinite(ys[:-1]) & np.isfinite(ys[1:]))
+    idx = np.flatnonzero(~undefined & (steps > 0.02 * scale))
+
+    a, b, ya, yb = xs[idx], xs[idx + 1], ys[idx], ys[idx + 1]
+    with np.errstate(all="ignore"):
+        for _ in range(iterations):
+            m = (a + b) / 2
+            ym = f(m)
+            go_left = ~np.isfinite(ym) | (np.abs(ym - ya) >= np.abs(yb - ym))
+            b, yb = np.where(go_left, m, b), np.where(go_left, ym, yb)
+            a, ya = np.where(go_left, a, m), np.where(go_left, ya, ym)
+        jumps = ~np.isfinite(yb - ya) | (np.abs(yb - ya) > 1e-3 * scale)
+
+    breaks = undefined.copy()
+    breaks[idx[jumps]] = True
+    return breaks
+
+
+def _compact(values):
+    return [float(f"{v:.6g}") for v in values]
+
+
+def plot_data(expr_str: str, x_min=-10.0, x_max=10.0, max_points=PLOT_POINT_BUDGET) -> dict:
+    """
+    Curve samples for client-side drawing: {"expression", "x_range",
+    "y_range", "points", "segments": [{"x": [...], "y": [...]}, ...]}.
+    Segments are split at discontinuities, asymptotes and undefined regions;
+    y_range is a viewport that ignores asymptote spikes.
+    """
+    x, expr = parse_plot_expression(expr_str)
+    if expr.free_symbols - {x}:
+        raise ValueError("only expressions in x can be plotted")
+
+    f = compile_expression(x, expr)  # once: refine passes and bisection call it ~45 times
+    xs, ys = adaptive_sample(f, x_min, x_max, max_points)
+    scale = _robust_scale(ys)
+    breaks = _find_breaks(f, xs, ys, scale)
+
+    segments = []
+    for part in np.split(np.arange(len(xs)), np.flatnonzero(breaks) + 1):
+        part = part[np.isfinite(ys[part])]
+        if part.size:
+            segments.append({"x": _compact(xs[part]), "y": _compact(ys[part])})
+
+    # Viewport from a uniform grid: adaptive samples cluster at poles and would skew it
+    grid = f(np.linspace(x_min, x_max, 201))
+    finite = grid[np.isfinite(grid)]
+    if finite.size:
+        lo, hi = float(finite.min()), float(finite.max())
+        p_lo, p_hi = np.percentile(finite, [2, 98])
+        if hi - lo > 20 * (p_hi - p_lo) > 0:  # asymptote spikes would flatten the view
+            lo, hi = float(p_lo), float(p_hi)
+        pad = (hi - lo) * 0.1 or 1.0
+        y_range = _compact([lo - pad, hi + pad])
+    else:
+        y_range = [-1.0, 1.0]
+
+    return {
+        "expression": str(expr),
+        "x_range": [x_min, x_max],
+        "y_range": y_range,
+        "points": int(sum(len(seg["x"]) for seg in segments)),
+        "segments": segments,
+    }
+
+
+def handle_plot_data(question: str) -> dict:
+    """JSON plot mode: sampled curve data instead of a rendered PNG."""
+    question = canonical_question(question)
+    key = f"plot-data:{question}"
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        data = run_in_math_pool(plot_data, question)
+    except MathBusy:
+        return {"success": False, "response": "⏳ I'm working on a lot of math right now. Please try again in a moment."}
+    except MathTimeout:
+        return {"success": False, "response": "⏳ That graph is too hard to draw here."}
+    except Exception as e:
+        return {"success": False, "response": f"⚠️ Graph error: {e}"}
+    result = {"success": True, "response": f"📈 Graph of y = {data['expression']}", "plot": data}
+    result_cache.put(key, result)
+    return result
+
+
 # === Unified math handler ===
-def handle_math_question_advanced(question: str) -> str:
+def solve_math_question(question: str) -> str:
+    """
+    All SymPy work for one question. Runs inside a math worker process, so it
+    may raise or be killed; handle_math_question_advanced deals with both.
+    """
     q = question.strip().replace("^", "**")  # normalize powers
 
     # Detect simple arithmetic (numbers, operators, parentheses only)
     if re.fullmatch(r'[\d\s\+\-\*\/\(\)]+', q):
         return step_by_step_arithmetic_full(q)
 
-    try:
-        # Derivative
-        if q.lower().startswith("diff "):
-            expr = parse_expr(question[5:], transformations=transformations)
-            var = list(expr.free_symbols)[0]
-            return pretty(diff(expr, var))
-
-        # Integral
-        if q.lower().startswith("integrate "):
-            expr = parse_expr(question[9:], transformations=transformations)
-            var = list(expr.free_symbols)[0]
-            return pretty(integrate(expr, var)) + " + C"
-
-        # Limit
-        if q.lower().startswith("limit "):
-            match = re.search(r'limit (.+) as (.+)->(.+)', q.lower())
-            if match:
-                expr, var, pt = match.groups()
-                return str(limit(parse_expr(expr), symbols(var), sympify(pt)))
-
-        # Equation solving
-        if "=" in q:
-            return step_by_step_solve(question)
-
-        # Graphing
-        if "plot" in q.lower():
-            return plot_expression(question)
-
-        # Complex arithmetic that slipped through
-        expr = parse_expr(q, transformations=transformations)
-        if not expr.free_symbols:
-            return step_by_step_arithmetic_full(question)
-
-        # Algebraic simplification
-        return f"🧮 Simplified:\n   {pretty(simplify(expr))}"
+    # Derivative
+    if q.lower().startswith("diff "):
+        expr = parse_cached(question[5:])
+        var = list(expr.free_symbols)[0]
+        return pretty(diff(expr, var))
+
+    # Integral
+    if q.lower().startswith("integrate "):
+        expr = parse_cached(question[9:])
+        var = list(expr.free_symbols)[0]
+        return pretty(integrate(expr, var)) + " + C"
+
+    # Limit
+    if q.lower().startswith("limit "):
+        match = re.search(r'limit (.+) as (.+)->(.+)', q.lower())
+        if match:
+            expr, var, pt = match.groups()
+            return str(limit(parse_expr(expr), symbols(var), sympify(pt)))
+
+    # Equation solving
+    if "=" in q:
+        return step_by_step_solve(question)
+
+    # Graphing
+    if "plot" in q.lower():
+        return plot_expression(question)
 
+    # Complex arithmetic that slipped through
+    expr = parse_cached(q)
+    if not expr.free_symbols:
+        return step_by_step_arithmetic_full(question)
+
+    # Algebraic simplification
+    return f"🧮 Simplified:\n   {pretty(simplify(expr))}"
+
+
+def handle_math_question_advanced(question: str) -> str:
+    question = canonical_question(question)
+    cached = result_cache.get(question)
+    if cached is not None:
+        return cached
+
+    # Plain arithmetic is exact and bounded, so it is answered inline without a worker
+    answer = arithmetic_steps_fast(question)
+    try:
+        if answer is None:
+            # Off the request thread, with CPU/memory limits (see math_pool.py)
+            answer = run_in_math_pool(solve_math_question, question)
+        # Graph files have their own lifecycle; errors may be transient, so they are not kept
+        if "plot" not in question.lower() and not answer.startswith("⚠️"):
+            result_cache.put(question, answer)
+        return answer
+    except MathBusy:
+        return "⏳ I'm working on a lot of math right now. Please try again in a moment."
+    except MathTimeout:
+        return ("⏳ That one is too hard to work out here, so I'm trying Wolfram Alpha...\n\n"
+                + query_wolframalpha(question))
     except Exception:
         # Wolfram Alpha fallback for anything SymPy can't handle
         return query_wolframalpha(question)
 
 
+def stream_math_question(question: str):
+    """
+    handle_math_question_advanced, one step at a time. Plain arithmetic is
+    streamed from the tutor as each step is worked out (and cached once
+    complete); cached answers and everything else (which needs a worker)
+    arrive as a single chunk.
+    """
+    question = canonical_question(question)
+    cached = result_cache.get(question)
+    steps = None if cached is not None else arithmetic_step_stream(question)
+    if steps is None:
+        yield cached if cached is not None else handle_math_question_advanced(question)
+        return
+
+    done = []
+    for step in steps:
+        done.append(step)
+        yield step
+    if not done[0].startswith("⚠️"):
+        result_cache.put(question, "\n".join(done))
+
+
 # === Science handler ===
 def handle_science_question(question: str, memory_logger=None) -> str:
     return handle_science_question_advanced(question, memory_logger)
@@ -430,3 +977,52 @@ def process_query(user_input: str, mode: str = None, memory_logger=None) -> str:
     if mode == "science":
         return handle_science_question(user_input, memory_logger)
     return "⚠️ Unknown mode."
+
+
+# === CLI math & science mode (mode 2) ===
+def handle_math_and_science_mode(user_name, memory_logger):
+    """CLI math mode: one question at a time, or a whole pasted worksheet."""
+    from math_worksheet import split_worksheet, solve_worksheet
+
+    print("\n=== ➗ Math & Science Mode ===")
+    print("Type a math question, 'science <question>', 'worksheet' to paste many problems, or 'back'.")
+
+    while True:
+        command = input("Math question: ").strip()
+        if not command:
+            continue
+        if command.lower() == "back":
+            print("🔙 Returning to previous menu...\n")
+            break
+
+        if command.lower() == "worksheet":
+            path = input("Path to a worksheet file (blank to paste problems, end with an empty line): ").strip()
+            if path:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        problems = split_worksheet(f.read())
+                except OSError as e:
+                    print(f"❌ Could not read {path}: {e}")
+                    continue
+            else:
+                problems = split_worksheet("\n".join(iter(lambda: input("> "), "")))
+
+            for event in solve_worksheet(problems):
+                if event["type"] == "start":
+                    print(f"📝 Solving {event['total']} problems ({event['unique']} unique)...")
+                elif event["type"] == "result":
+                    numbers = ", ".join(f"#{i + 1}" for i in event["indices"])
+                    print(f"\n{numbers}: {event['question']}\n{event['answer']}")
+                else:
+                    print(f"\n✅ Worksheet done in {event['elapsed_ms'] / 1000:.1f}s")
+            if memory_logger:
+                memory_logger.log_interaction(f"Worksheet: {len(problems)} problems", "", tags=["math", "worksheet"])
+            continue
+
+        if command.lower().startswith("science "):
+            response = process_query(command[8:], mode="science", memory_logger=memory_logger)
+        else:
+            response = process_query(command, mode="math", memory_logger=memory_logger)
+        print(response)
+        if memory_logger:
+            memory_logger.log_interaction(command, str(response), tags=["math"])
@@ -0,0 +1,67 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from math_processor import canonical_question, handle_math_question_advanced
+from math_pool import get_math_pool
+
+MAX_WORKSHEET_PROBLEMS = 100
+
+# "1.", "2)", "(3)", "a)", "Q4:" ... in front of a pasted problem
+_NUMBERING_RE = re.compile(r'^\s*(?:\(?(?:q\s*)?(?:\d{1,3}|[a-z])[.):]|\(\d{1,3}\))\s+', re.IGNORECASE)
+
+
+def split_worksheet(text):
+    """One problem per non-empty line, with leading numbering ("1.", "b)", "(3)") removed."""
+    problems = []
+    for line in text.splitlines():
+        line = _NUMBERING_RE.sub("", line).strip()
+        if line:
+            problems.append(line)
+    return problems
+
+
+def _solve(question):
+    start = time.perf_counter()
+    try:
+        answer = handle_math_question_advanced(question)
+        success = True
+    except Exception as e:
+        answer, success = f"⚠️ Error processing math input: {e}", False
+    return answer, success, round((time.perf_counter() - start) * 1000, 1)
+
+
+def solve_worksheet(problems, max_parallel=None):
+    """
+    Solve a list of problems, yielding one event dict at a time:
+      {"type": "start", "total", "unique"}
+      {"type": "result", "indices", "question", "answer", "success", "elapsed_ms"}  (in completion order)
+      {"type": "done", "elapsed_ms"}
+    Identical problems (same canonical form) are solved once and reported
+    with every index they appear at. Problems run on as many threads as the
+    math pool has workers, each waiting on its own worker, so one slow
+    integral times out alone while the rest of the sheet keeps flowing.
+    """
+    problems = [p.strip() for p in problems if p and p.strip()][:MAX_WORKSHEET_PROBLEMS]
+    groups = {}
+    for i, problem in enumerate(problems):
+        groups.setdefault(canonical_question(problem), []).append(i)
+
+    start = time.perf_counter()
+    yield {"type": "start", "total": len(problems), "unique": len(groups)}
+    if groups:
+        max_parallel = max_parallel or get_math_pool().size
+        with ThreadPoolExecutor(max_workers=min(max_parallel, len(groups))) as executor:
+            futures = {executor.submit(_solve, problems[indices[0]]): indices for indices in groups.values()}
+            try:
+                for future in as_completed(futures):
+                    indices = futures[future]
+                    answer, success, elapsed_ms = future.result()
+                    yield {
+                        "type": "result", "indices": indices, "question": problems[indices[0]],
+                        "answer": answer, "success": success, "elapsed_ms": elapsed_ms,
+                    }
+            finally:
+                for future in futures:
+                    future.cancel()  # client went away: drop problems that have not started
+    yield {"type": "done", "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}
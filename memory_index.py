@@ -0,0 +1,179 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+
+from memory_store import SegmentLog
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def to_epoch(value):
+    """Accept a datetime, epoch number, log timestamp or ISO string and return epoch seconds."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT).timestamp()
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+class MemoryIndex:
+    """
+    Persisted secondary indexes over a MemoryLogger's SegmentLog.
+
+    For every log entry we keep its timestamp and byte location, plus posting
+    lists (sorted seq arrays) for emotion, tags and belief_tags. Queries
+    intersect the smallest candidate list with the others and only read the
+    matching records back from the log.
+
+    The index has its own append-only journal (one compact record per entry),
+    so keeping it current costs O(1) per log_interaction. On open the journal
+    is replayed and anything the log has that the journal missed is re-indexed.
+    """
+
+    def __init__(self, directory, store: SegmentLog, commit_interval=0.05, fsync="batch"):
+        self.store = store
+        self.journal = SegmentLog(directory, commit_interval=commit_interval, fsync=fsync)
+
+        self._timestamps = array("d")  # epoch seconds, indexed by seq
+        self._offsets = array("Q")     # byte offset in the seq's segment
+        self._by_time = []             # sorted (epoch, seq)
+        self._by_emotion = {}
+        self._by_tag = {}
+        self._by_belief_tag = {}
+        self._load()
+
+    # --- Internal helpers ---
+    def _load(self):
+        for _, rec in self.journal.iter_from(0):
+            if rec["s"] != len(self._offsets) or rec["s"] >= self.store.next_seq:
+                continue  # stale or duplicate journal record
+            self._index(rec["s"], rec["o"], rec["t"], rec["e"], rec["g"], rec["b"])
+
+        # Catch up on entries the journal never saw (e.g. crash between the two writes)
+        for seq, offset, entry in self.store.iter_located(len(self._offsets)):
+            self.add(seq, offset, entry)
+
+    def _index(self, seq, offset, ts, emotion, tags, belief_tags):
+        self._timestamps.append(ts)
+        self._offsets.append(offset)
+        if self._by_time and ts < self._by_time[-1][0]:
+            insort(self._by_time, (ts, seq))
+        else:
+            self._by_time.append((ts, seq))
+        if emotion:
+            self._by_emotion.setdefault(emotion, array("I")).append(seq)
+        for tag in set(tags):
+            self._by_tag.setdefault(tag, array("I")).append(seq)
+        for tag in set(belief_tags):
+            self._by_belief_tag.setdefault(tag, array("I")).append(seq)
+
+    @staticmethod
+    def _contains(postings, seq):
+        i = bisect_left(postings, seq)
+        return i < len(postings) and postings[i] == seq
+
+    def _time_range_seqs(self, start, end):
+        lo = 0 if start is None else bisect_left(self._by_time, (start, -1))
+        hi = len(self._by_time) if end is None else bisect_right(self._by_time, (end, float("inf")))
+        return lo, hi
+
+    # --- Public methods ---
+    def __len__(self):
+        return len(self._offsets)
+
+    def add(self, seq, offset, entry):
+        """Index one freshly appended log entry. O(1) amortised."""
+        ts = to_epoch(entry.get("timestamp")) or 0.0
+        emotion = entry.get("emotion")
+        tags = entry.get("tags") or []
+        belief_tags = entry.get("belief_tags") or []
+        self._index(seq, offset, ts, emotion, tags, belief_tags)
+        self.journal.append({"s": seq, "o": offset, "t": ts, "e": emotion, "g": tags, "b": belief_tags})
+
+    def query(self, start=None, end=None, emotion=None, tags=None, belief_tags=None,
+              cursor=None, limit=50, newest_first=True):
+        """
+        Return entries matching every given filter, one page at a time.
+
+        start/end bound the timestamp (inclusive), tags/belief_tags must all be
+        present on an entry. Pass the returned next_cursor back in to get the
+        following page; it is None once the results are exhausted.
+        """
+        start, end = to_epoch(start), to_epoch(end)
+        limit = max(1, int(limit))
+        if isinstance(tags, str):
+            tags = [tags]
+        if isinstance(belief_tags, str):
+            belief_tags = [belief_tags]
+
+        postings = []
+        if emotion:
+            postings.append(self._by_emotion.get(emotion, array("I")))
+        for tag in tags or []:
+            postings.append(self._by_tag.get(tag, array("I")))
+        for tag in belief_tags or []:
+            postings.append(self._by_belief_tag.get(tag, array("I")))
+        postings.sort(key=len)
+
+        # Drive the scan from whichever candidate set is smallest
+        if start is None and end is None and not postings:
+            driver = range(len(self._offsets))
+        elif start is not None or end is not None:
+            lo, hi = self._time_range_seqs(start, end)
+            if not postings or hi - lo < len(postings[0]):
+                driver = sorted(seq for _, seq in self._by_time[lo:hi])
+            else:
+                driver = postings[0]
+                postings = postings[1:]
+        else:
+            driver, postings = postings[0], postings[1:]
+
+        lo, hi = 0, len(driver)
+        if cursor is not None:
+            if newest_first:
+                hi = bisect_left(driver, int(cursor))
+            else:
+                lo = bisect_right(driver, int(cursor))
+
+        matched = []
+        for i in (range(hi - 1, lo - 1, -1) if newest_first else range(lo, hi)):
+            seq = driver[i]
+            ts = self._timestamps[seq]
+            if (start is not None and ts < start) or (end is not None and ts > end):
+                continue
+            if all(self._contains(p, seq) for p in postings):
+                matched.append(seq)
+                if len(matched) > limit:
+                    break
+
+        has_more = len(matched) > limit
+        matched = matched[:limit]
+        entries = self.fetch(matched)
+        return {
+            "entries": entries,
+            "next_cursor": str(matched[-1]) if has_more else None
+        }
+
+    def fetch(self, seqs):
+        """Read the log entries for the given seqs straight from their recorded offsets."""
+        return self.store.read_many([(seq, self._offsets[seq]) for seq in seqs])
+
+    def flush(self):
+        self.journal.flush()
+
+    def close(self):
+        self.journal.close()
+
+    def clear(self):
+        self.journal.truncate()
+        self._timestamps = array("d")
+        self._offsets = array("Q")
+        self._by_time = []
+        self._by_emotion = {}
+        self._by_tag = {}
+        self._by_belief_tag = {}
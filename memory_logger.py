@@ -1,24 +1,112 @@
 import os
 import json
 import uuid
+import threading
 from datetime import datetime
 from textblob import TextBlob
 from belief_system import BeliefModel
+from memory_store import SegmentLog
+from memory_index import MemoryIndex
+from memory_search import SearchIndex
+from memory_rollups import MemoryRollups
+
+
+class _LogFiles:
+    """
+    The segment log and its derived indexes for one log directory. Each keeps
+    its own sequence counter and offsets in memory, so two open copies of the
+    same directory would hand out the same seqs and undo each other's clears;
+    MemoryLogger therefore shares one _LogFiles per directory (see _open_logs).
+    """
+
+    def __init__(self, user_name, file_path, segment_bytes, commit_interval, fsync):
+        self.refs = 0
+        self.write_lock = threading.Lock()  # keeps log seqs and index positions in step
+
+        # Append-only segmented log; replays whatever is on disk when opened
+        self.store = SegmentLog(file_path, segment_bytes=segment_bytes,
+                                commit_interval=commit_interval, fsync=fsync)
+        self._migrate_legacy_log(user_name)
+        self.index = MemoryIndex(os.path.join(file_path, "index"), self.store,
+                                 commit_interval=commit_interval, fsync=fsync)
+        self.search_index = SearchIndex(os.path.join(file_path, "search"), self.store,
+                                        commit_interval=commit_interval, fsync=fsync)
+        self.rollups = MemoryRollups(os.path.join(file_path, "rollups.json"), self.store)
+
+    def _migrate_legacy_log(self, user_name):
+        """Move entries from the old single-file JSON log into the segment log (runs once)."""
+        legacy_path = f"{user_name}_memory_log.json"
+        if not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path, 'r') as f:
+                entries = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return
+        if len(self.store) == 0:
+            for entry in entries:
+                self.store.append(entry)
+            self.store.flush()
+        os.replace(legacy_path, legacy_path + ".migrated")
+
+    def close(self):
+        self.store.close()
+        self.index.close()
+        self.search_index.close()
+        self.rollups.flush()
+
+
+_open_logs = {}  # realpath of log directory -> _LogFiles
+_open_logs_lock = threading.Lock()
 
 
 class MemoryLogger:
-    def __init__(self, user_name, belief_model: BeliefModel):
+    def __init__(self, user_name, belief_model: BeliefModel, segment_bytes=4 * 1024 * 1024,
+                 commit_interval=0.05, fsync="batch"):
         self.user_name = user_name
-        self.file_path = f"{user_name}_memory_log.json"
+        self.file_path = f"{user_name}_memory_log"
         self.belief_model = belief_model
 
-        # If the log doesn't exist, create it
-        if not os.path.exists(self.file_path):
-            with open(self.file_path, 'w') as f:
-                json.dump([], f)
+        # Every logger for the same directory shares one set of open files
+        key = os.path.realpath(self.file_path)
+        with _open_logs_lock:
+            files = _open_logs.get(key)
+            if files is None:
+                files = _open_logs[key] = _LogFiles(user_name, self.file_path, segment_bytes,
+                                                    commit_interval, fsync)
+            files.refs += 1
+        self._files = files
+        self._closed = False
+        self._write_lock = files.write_lock
+        self.store = files.store
+        self.index = files.index
+        self.search_index = files.search_index
+        self.rollups = files.rollups
 
     def get_logs(self):
-        return self._read_log()
+        return list(self.iter_logs())
+
+    def iter_logs(self):
+        """Stream log entries oldest-first without loading the whole history."""
+        return iter(self.store)
+
+    def query_logs(self, start=None, end=None, emotion=None, tags=None, belief_tags=None,
+                   cursor=None, limit=50):
+        """Filtered, paginated view of the log backed by the secondary indexes."""
+        return self.index.query(start=start, end=end, emotion=emotion, tags=tags,
+                                belief_tags=belief_tags, cursor=cursor, limit=limit)
+
+    def search(self, query, k=10):
+        """Full-text search over past questions and responses, best BM25 matches first."""
+        hits = self.search_index.search(query, k)
+        entries = self.index.fetch([seq for seq, _ in hits])
+        for entry, (_, score) in zip(entries, hits):
+            entry["score"] = round(score, 4)
+        return entries
+
+    def get_stats(self, period="day", last=7):
+        """Emotion and tag counts for the last N days/weeks, read from the rollups."""
+        return self.rollups.stats(period=period, last=last)
 
     def analyze_emotion(self, text):
         polarity = TextBlob(text).sentiment.polarity
@@ -52,25 +140,52 @@ class MemoryLogger:
             "belief_tags": belief_tags
         }
 
-        data = self._read_log()
-        data.append(entry)
-        self._write_log(data)
+        with self._write_lock:
+            seq, offset = self.store.append_record(entry)
+            self.index.add(seq, offset, entry)
+            self.search_index.add(seq, entry)
+            self.rollups.add(seq, entry)
 
         if belief_tags:
             self.belief_model.reinforce_beliefs(belief_tags, emotion=emotion)
 
     def _read_log(self):
-        with open(self.file_path, 'r') as f:
-            return json.load(f)
+        return self.get_logs()
+
+    def flush(self):
+        """Force buffered log entries to disk."""
+        self.store.flush()
+        self.index.flush()
+        self.search_index.flush()
+        self.rollups.flush()
+
+    def clear_logs(self):
+        """Delete the whole history."""
+        with self._write_lock:
+            self.store.truncate()
+            self.index.clear()
+            self.search_index.clear()
+            self.rollups.clear()
 
-    def _write_log(self, data):
-        with open(self.file_path, 'w') as f:
-            json.dump(data, f, indent=4)
+    def close(self):
+        """Release this logger; the files are closed when the last logger for the directory closes."""
+        with _open_logs_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._files.refs -= 1
+            last = self._files.refs == 0
+            if last:
+                _open_logs.pop(os.path.realpath(self.file_path), None)
+        if last:
+            self._files.close()
 
     def to_dict(self):
         """Convert the MemoryLogger to a serializable dictionary format."""
         return {"user_name": self.user_name, "file_path": self.file_path}
 
     def view_logs(self):
-        data = self._read_log()
-        return data
+        for entry in self.iter_logs():
+            print(f"[{entry.get('timestamp')}] ({entry.get('emotion')}) {entry.get('question')}")
+            if entry.get('response'):
+                print(f"    -> {entry.get('response')}")
@@ -0,0 +1,116 @@
+import os
+import json
+from datetime import datetime, timedelta
+
+from memory_index import TIMESTAMP_FORMAT
+
+PERIODS = ("day", "week")
+
+
+def period_key(moment, period):
+    if period == "day":
+        return moment.strftime("%Y-%m-%d")
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _empty_bucket():
+    return {"count": 0, "emotions": {}, "tags": {}, "belief_tags": {}}
+
+
+class MemoryRollups:
+    """
+    Materialized emotion/tag aggregates per day and per ISO week.
+
+    add() bumps a handful of counters per entry, so dashboards read
+    precomputed buckets instead of re-scanning the log. The rollups are
+    snapshotted to rollups.json next to the log together with the seq they
+    cover; on open, anything logged after the snapshot is folded back in.
+    """
+
+    def __init__(self, file_path, store=None, checkpoint_every=50):
+        self.file_path = file_path
+        self.store = store
+        self.checkpoint_every = checkpoint_every
+        self._dirty = 0
+        self._state = {"seq": 0, "totals": _empty_bucket(), "day": {}, "week": {}}
+        self._load()
+
+    # --- Internal helpers ---
+    def _load(self):
+        if os.path.exists(self.file_path):
+            try:
+                with open(self.file_path, "r", encoding="utf-8") as f:
+                    self._state = json.load(f)
+            except json.JSONDecodeError:
+                pass
+
+        if self.store is not None:
+            if self._state["seq"] > self.store.next_seq:
+                self.clear()  # snapshot is ahead of the log (log was truncated)
+            for seq, entry in self.store.iter_from(self._state["seq"]):
+                self.add(seq, entry)
+            self.flush()
+
+    @staticmethod
+    def _bump(bucket, entry):
+        bucket["count"] += 1
+        emotion = entry.get("emotion")
+        if emotion:
+            bucket["emotions"][emotion] = bucket["emotions"].get(emotion, 0) + 1
+        for field in ("tags", "belief_tags"):
+            counts = bucket[field]
+            for tag in entry.get(field) or []:
+                counts[tag] = counts.get(tag, 0) + 1
+
+    # --- Public methods ---
+    def add(self, seq, entry):
+        """Fold one log entry into the day, week and all-time buckets. O(#tags)."""
+        try:
+            moment = datetime.strptime(entry.get("timestamp"), TIMESTAMP_FORMAT)
+        except (TypeError, ValueError):
+            moment = datetime.now()
+
+        self._bump(self._state["totals"], entry)
+        for period in PERIODS:
+            key = period_key(moment, period)
+            bucket = self._state[period].get(key)
+            if bucket is None:
+                bucket = self._state[period][key] = _empty_bucket()
+            self._bump(bucket, entry)
+        self._state["seq"] = seq + 1
+
+        self._dirty += 1
+        if self._dirty >= self.checkpoint_every:
+            self.flush()
+
+    def stats(self, period="day", last=7, now=None):
+        """
+        Return the last `last` buckets for the period (oldest first) plus all-time totals.
+        Only the requested buckets are touched, however long the history is.
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period '{period}'. Use one of: {', '.join(PERIODS)}")
+        now = now or datetime.now()
+        step = timedelta(days=1 if period == "day" else 7)
+
+        buckets = []
+        for i in range(max(1, int(last)) - 1, -1, -1):
+            key = period_key(now - i * step, period)
+            buckets.append({"period": key, **self._state[period].get(key, _empty_bucket())})
+        return {"period": period, "buckets": buckets, "totals": self._state["totals"]}
+
+    def flush(self):
+        """Atomically write the rollup snapshot if anything changed."""
+        if not self._dirty and os.path.exists(self.file_path):
+            return
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f)
+        os.replace(tmp_path, self.file_path)
+        self._dirty = 0
+
+    def clear(self):
+        self._state = {"seq": 0, "totals": _empty_bucket(), "day": {}, "week": {}}
+        self._dirty = 1
+        self.flush()
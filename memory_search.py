@@ -0,0 +1,156 @@
+import re
+import math
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from memory_store import SegmentLog
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "did", "do", "for", "from", "had",
+    "has", "have", "he", "her", "his", "i", "if", "in", "into", "is", "it", "its", "me", "my",
+    "of", "on", "or", "our", "she", "so", "that", "the", "their", "them", "then", "there",
+    "they", "this", "to", "was", "we", "were", "what", "when", "where", "which", "who", "why",
+    "will", "with", "you", "your", "about", "can", "just", "i'm", "it's", "how"
+}
+
+
+def tokenize(text):
+    """Lower-case word tokens with stopwords and single characters removed."""
+    tokens = []
+    for token in TOKEN_RE.findall((text or "").lower()):
+        if token.endswith("'s"):
+            token = token[:-2]
+        if len(token) > 1 and token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+class SearchIndex:
+    """
+    Incrementally maintained inverted index with BM25 ranking over the
+    question/response text of memory log entries.
+
+    Postings are kept as parallel compact arrays (seqs, term frequencies) in
+    seq order, so adding an entry is an append per distinct term. Queries use
+    max-score pruning: terms are scored rarest-first, and once the remaining
+    terms can no longer lift an unseen entry into the top k, those (usually
+    very common) terms are only probed for the entries already in the running.
+
+    If a directory is given, each entry's term counts are journaled so the
+    index survives restarts without re-tokenizing the whole log.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, directory=None, store: SegmentLog = None, commit_interval=0.05, fsync="batch"):
+        self.store = store
+        self.journal = SegmentLog(directory, commit_interval=commit_interval, fsync=fsync) if directory else None
+
+        self._postings = {}  # term -> (array of seqs, array of term frequencies)
+        self._doc_lengths = array("I")
+        self._total_length = 0
+        self._load()
+
+    # --- Internal helpers ---
+    def _load(self):
+        if self.journal is None:
+            return
+        limit = self.store.next_seq if self.store is not None else float("inf")
+        for _, rec in self.journal.iter_from(0):
+            if rec["s"] != len(self._doc_lengths) or rec["s"] >= limit:
+                continue
+            self._index(rec["s"], rec["tf"], rec["n"])
+
+        if self.store is not None:
+            for seq, entry in self.store.iter_from(len(self._doc_lengths)):
+                self.add(seq, entry)
+
+    def _index(self, seq, term_counts, length):
+        for term, tf in term_counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("I"))
+            postings[0].append(seq)
+            postings[1].append(tf)
+        self._doc_lengths.append(length)
+        self._total_length += length
+
+    @staticmethod
+    def entry_text(entry):
+        return f"{entry.get('question') or ''} {entry.get('response') or ''}"
+
+    # --- Public methods ---
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    def add(self, seq, entry):
+        """Index one log entry's question and response. Cost is O(#distinct terms)."""
+        tokens = tokenize(self.entry_text(entry))
+        term_counts = dict(Counter(tokens))
+        self._index(seq, term_counts, len(tokens))
+        if self.journal is not None:
+            self.journal.append({"s": seq, "tf": term_counts, "n": len(tokens)})
+
+    def search(self, query, k=10):
+        """Return up to k (seq, score) pairs, best first."""
+        n_docs = len(self._doc_lengths)
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t in self._postings]
+        if not terms or n_docs == 0 or k <= 0:
+            return []
+
+        avg_length = self._total_length / n_docs or 1.0
+        k1, b = self.K1, self.B
+        lengths = self._doc_lengths
+
+        weighted = []
+        for term in terms:
+            seqs, tfs = self._postings[term]
+            df = len(seqs)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            weighted.append((idf, seqs, tfs))
+        weighted.sort(key=lambda item: (-item[0], len(item[1])))
+
+        # remaining_bound[i] = best score terms i.. could still add to any entry
+        remaining_bound = [0.0] * (len(weighted) + 1)
+        for i in range(len(weighted) - 1, -1, -1):
+            remaining_bound[i] = remaining_bound[i + 1] + weighted[i][0] * (k1 + 1)
+
+        scores = {}
+        for i, (idf, seqs, tfs) in enumerate(weighted):
+            threshold = heapq.nlargest(k, scores.values())[-1] if len(scores) >= k else 0.0
+
+            if len(scores) >= k and remaining_bound[i] <= threshold:
+                # Unseen entries can no longer make the cut: only probe existing candidates
+                for seq in scores:
+                    j = bisect_left(seqs, seq)
+                    if j < len(seqs) and seqs[j] == seq:
+                        tf = tfs[j]
+                        norm = k1 * (1 - b + b * lengths[seq] / avg_length)
+                        scores[seq] += idf * tf * (k1 + 1) / (tf + norm)
+                continue
+
+            for seq, tf in zip(seqs, tfs):
+                norm = k1 * (1 - b + b * lengths[seq] / avg_length)
+                scores[seq] = scores.get(seq, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def flush(self):
+        if self.journal is not None:
+            self.journal.flush()
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+
+    def clear(self):
+        if self.journal is not None:
+            self.journal.truncate()
+        self._postings = {}
+        self._doc_lengths = array("I")
+        self._total_length = 0
@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import atexit
+import threading
+from bisect import bisect_right
+
+
+class SegmentLog:
+    """
+    Append-only, line-delimited log split into size-bounded segment files.
+
+    Each segment is named after the sequence number of its first record
+    (e.g. 000000000000.jsonl), so a record's seq can be located without
+    reading anything. Appends are buffered and written out by a background
+    group-commit thread; call flush() to force them to disk.
+
+    fsync policy:
+        "always" -> write and fsync on every append (safest, slowest)
+        "batch"  -> fsync once per group commit (default)
+        "never"  -> leave syncing to the OS
+    """
+
+    SEGMENT_SUFFIX = ".jsonl"
+
+    def __init__(self, directory, segment_bytes=4 * 1024 * 1024, commit_interval=0.05, fsync="batch"):
+        if fsync not in ("always", "batch", "never"):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.commit_interval = commit_interval
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()  # keeps group commits in order
+        self._wakeup = threading.Condition(self._lock)
+        self._pending = []  # [(segment_base, bytes)] waiting for the next group commit
+        self._closed = False
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._segments = []  # sorted base seqs
+        self._next_seq = 0
+        self._active_base = 0
+        self._active_size = 0
+        self._replay()
+
+        self._flusher = None
+        if self.fsync != "always":
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
+
+    # --- Internal helpers ---
+    def _segment_path(self, base):
+        return os.path.join(self.directory, f"{base:012d}{self.SEGMENT_SUFFIX}")
+
+    def _replay(self):
+        """Rebuild segment bookkeeping from disk and drop any torn trailing write."""
+        bases = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.SEGMENT_SUFFIX):
+                try:
+                    bases.append(int(name[:-len(self.SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+        self._segments = sorted(bases)
+
+        if not self._segments:
+            self._segments = [0]
+            open(self._segment_path(0), "ab").close()
+
+        self._active_base = self._segments[-1]
+        path = self._segment_path(self._active_base)
+        count = 0
+        valid_size = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial record from a crash mid-write
+                count += 1
+                valid_size += len(line)
+        if valid_size != os.path.getsize(path):
+            with open(path, "r+b") as f:
+                f.truncate(valid_size)
+
+        self._active_size = valid_size
+        self._next_seq = self._active_base + count
+
+    def _write_batch(self, batch):
+        """Write a batch of (segment_base, bytes) records, grouped by segment."""
+        by_segment = {}
+        for base, data in batch:
+            by_segment.setdefault(base, []).append(data)
+        for base in sorted(by_segment):
+            with open(self._segment_path(base), "ab") as f:
+                f.write(b"".join(by_segment[base]))
+                if self.fsync != "never":
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._wakeup.wait()
+                if self._closed and not self._pending:
+                    return
+            # Let more appends pile up so they share one write + fsync
+            time.sleep(self.commit_interval)
+            self.flush()
+
+    # --- Public methods ---
+    def __len__(self):
+        return self._next_seq
+
+    @property
+    def next_seq(self):
+        return self._next_seq
+
+    def append(self, record):
+        """Append one JSON-serialisable record and return its sequence number. O(1)."""
+        return self.append_record(record)[0]
+
+    def append_record(self, record):
+        """Append one record and return (seq, byte offset within its segment)."""
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._closed:
+                raise ValueError("SegmentLog is closed")
+            if self._active_size and self._active_size + len(data) > self.segment_bytes:
+                self._active_base = self._next_seq
+                self._active_size = 0
+                self._segments.append(self._active_base)
+            seq = self._next_seq
+            offset = self._active_size
+            self._next_seq += 1
+            self._active_size += len(data)
+
+            if self.fsync == "always":
+                self._write_batch([(self._active_base, data)])
+            else:
+                self._pending.append((self._active_base, data))
+                self._wakeup.notify()
+        return seq, offset
+
+    def flush(self):
+        """Force all buffered appends to disk (group commit)."""
+        with self._io_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, []
+            # Appends keep flowing into the next batch while this one is written
+            self._write_batch(batch)
+
+    def iter_from(self, start_seq=0):
+        """Stream (seq, record) pairs from start_seq onwards, one segment at a time."""
+        for seq, _, record in self.iter_located(start_seq):
+            yield seq, record
+
+    def iter_located(self, start_seq=0):
+        """Like iter_from, but also yields each record's byte offset: (seq, offset, record)."""
+        self.flush()
+        with self._lock:
+            segments = list(self._segments)
+            end_seq = self._next_seq
+        if start_seq >= end_seq:
+            return
+
+        first = max(bisect_right(segments, start_seq) - 1, 0)
+        for base in segments[first:]:
+            seq = base
+            offset = 0
+            with open(self._segment_path(base), "rb") as f:
+                for line in f:
+                    if seq >= end_seq:
+                        return
+                    if seq >= start_seq:
+                        yield seq, offset, json.loads(line)
+                    seq += 1
+                    offset += len(line)
+
+    def read_many(self, located):
+        """
+        Read specific records given [(seq, offset), ...] without scanning segments.
+        Returns the records in the order requested.
+        """
+        self.flush()
+        with self._lock:
+            segments = list(self._segments)
+
+        by_segment = {}
+        for i, (seq, offset) in enumerate(located):
+            base = segments[bisect_right(segments, seq) - 1]
+            by_segment.setdefault(base, []).append((offset, i))
+
+        results = [None] * len(located)
+        for base, wanted in by_segment.items():
+            with open(self._segment_path(base), "rb") as f:
+                for offset, i in sorted(wanted):
+                    f.seek(offset)
+                    results[i] = json.loads(f.readline())
+        return results
+
+    def __iter__(self):
+        for _, record in self.iter_from(0):
+            yield record
+
+    def truncate(self):
+        """Delete every segment and start over from seq 0."""
+        with self._io_lock, self._lock:
+            self._pending = []
+            for base in self._segments:
+                path = self._segment_path(base)
+                if os.path.exists(path):
+                    os.remove(path)
+            self._segments = [0]
+            self._next_seq = 0
+            self._active_base = 0
+            self._active_size = 0
+            open(self._segment_path(0), "ab").close()
+
+    def close(self):
+        """Flush outstanding appends and stop the group-commit thread."""
+        self.flush()
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify_all()
+        if self._flusher:
+            self._flusher.join(timeout=1)
@@ -0,0 +1,131 @@
+import re
+import calendar
+from datetime import datetime, timedelta
+
+from time_parser import _compile_phrase, _normalize, _WEEKDAYS
+
+_WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+_WD = "|".join(sorted(_WEEKDAYS, key=len, reverse=True))
+
+_REPEAT_RE = re.compile(
+    r"^(?:(?P<hourly>hourly|every\s+hour|every\s+(?P<n>\d+)\s+(?:hours?|hrs?|h))"
+    r"|(?P<daily>daily|every\s*day|each\s+day)"
+    r"|(?P<weekdays>weekdays|every\s+(?:weekday|workday|week\s*day)|(?:mon|monday)\s*(?:-|to|through)\s*(?:fri|friday))"
+    r"|(?P<weekly>weekly|every\s+week)(?:\s+on\s+(?P<wday1>" + _WD + r"))?"
+    r"|(?:every|each)\s+(?P<wday2>" + _WD + r")s?"
+    r"|(?P<monthly>monthly|every\s+month)(?:\s+on\s+the\s+(?P<dom>\d{1,2})(?:st|nd|rd|th)?)?"
+    r")(?:\s+(?P<rest>.+))?$"
+)
+_BARE_HOUR_RE = re.compile(r"^(?:at\s+)?(?P<hour>\d{1,2})$")
+
+
+def _parse_clock(rest, now):
+    """Time of day for a rule: "at 8am", "5:30 pm", a bare "8", or the current time if omitted."""
+    if not rest:
+        return now.hour, now.minute
+    rest = rest.strip()
+    bare = _BARE_HOUR_RE.match(rest)
+    if bare and int(bare.group("hour")) <= 23:
+        return int(bare.group("hour")), 0  # "every day at 8" is unambiguous here
+    spec = _compile_phrase(rest)
+    if not spec or spec[0] != "clock" or spec[1] or spec[2] is not None or spec[3] is None:
+        return None
+    return spec[3], spec[4]
+
+
+def parse_recurrence(text, now=None):
+    """
+    Parse a repeat phrase into a compact rule dict, or None if the text is not
+    a recurrence. Examples: "every weekday at 8am", "daily at 9", "every monday
+    at 5pm", "monthly on the 15th", "every 3 hours".
+    """
+    if not text or not text.strip():
+        return None
+    now = now or datetime.now()
+    match = _REPEAT_RE.match(_normalize(text))
+    if not match:
+        return None
+
+    if match.group("hourly"):
+        if match.group("rest"):
+            return None
+        interval = int(match.group("n") or 1)
+        if interval < 1:
+            return None
+        return {"freq": "hourly", "interval": interval, "start": now.replace(microsecond=0).timestamp()}
+
+    clock = _parse_clock(match.group("rest"), now)
+    if clock is None:
+        return None
+    rule = {"hour": clock[0], "minute": clock[1]}
+
+    if match.group("daily"):
+        rule["freq"] = "daily"
+    elif match.group("weekdays"):
+        rule["freq"] = "weekdays"
+    elif match.group("weekly") or match.group("wday2"):
+        wday = match.group("wday1") or match.group("wday2")
+        rule["freq"] = "weekly"
+        rule["weekday"] = _WEEKDAYS[wday] if wday else now.weekday()
+    else:
+        day = int(match.group("dom") or now.day)
+        if not 1 <= day <= 31:
+            return None
+        rule["freq"] = "monthly"
+        rule["day"] = day
+    return rule
+
+
+def _monthly(year, month, rule):
+    day = min(rule["day"], calendar.monthrange(year, month)[1])  # 31st -> last day in short months
+    return datetime(year, month, day, rule["hour"], rule["minute"])
+
+
+def next_occurrence(rule, after):
+    """
+    First occurrence of `rule` strictly after `after`. Constant time however
+    far `after` is from the last occurrence, so a rule that missed many fires
+    (e.g. while the server was down) re-arms in one step.
+    """
+    freq = rule["freq"]
+    if freq == "hourly":
+        step = rule["interval"] * 3600
+        elapsed = after.timestamp() - rule["start"]
+        periods = int(elapsed // step) + 1 if elapsed >= 0 else 0
+        return datetime.fromtimestamp(rule["start"] + periods * step)
+
+    if freq == "monthly":
+        candidate = _monthly(after.year, after.month, rule)
+        if candidate <= after:
+            year, month = (after.year + 1, 1) if after.month == 12 else (after.year, after.month + 1)
+            candidate = _monthly(year, month, rule)
+        return candidate
+
+    candidate = after.replace(hour=rule["hour"], minute=rule["minute"], second=0, microsecond=0)
+    if freq == "weekly":
+        candidate += timedelta(days=(rule["weekday"] - after.weekday()) % 7)
+        if candidate <= after:
+            candidate += timedelta(days=7)
+        return candidate
+
+    if candidate <= after:
+        candidate += timedelta(days=1)
+    if freq == "weekdays":
+        while candidate.weekday() >= 5:
+            candidate += timedelta(days=1)
+    return candidate
+
+
+def describe(rule):
+    """Short human-readable form of a rule, for responses and task lists."""
+    freq = rule["freq"]
+    if freq == "hourly":
+        return "every hour" if rule["interval"] == 1 else f"every {rule['interval']} hours"
+    at = datetime(2000, 1, 1, rule["hour"], rule["minute"]).strftime("%I:%M %p").lstrip("0")
+    if freq == "daily":
+        return f"every day at {at}"
+    if freq == "weekdays":
+        return f"every weekday at {at}"
+    if freq == "weekly":
+        return f"every {_WEEKDAY_NAMES[rule['weekday']]} at {at}"
+    return f"monthly on day {rule['day']} at {at}"
@@ -0,0 +1,91 @@
+import os
+import queue
+import threading
+
+
+class ReminderAudioCache:
+    """
+    Speaks reminders ahead of time.
+
+    prepare() queues a reminder for synthesis on one background thread, which
+    writes cache/reminders/{id}{ext} via the `synthesize(text, path)` callable.
+    When the alert fires, get() returns the ready file so playback starts
+    immediately instead of waiting on TTS. evict() drops the file once the
+    reminder is completed, deleted or cleared.
+    """
+
+    def __init__(self, synthesize, cache_dir=os.path.join("cache", "reminders"), ext=".wav"):
+        self.synthesize = synthesize
+        self.cache_dir = cache_dir
+        self.ext = ext
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._wanted = set()  # ids that should have audio; evict() removes them
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # --- Internal helpers ---
+    @staticmethod
+    def spoken_text(reminder):
+        return f"Reminder: {reminder['text']}"
+
+    def _remove(self, reminder_id):
+        try:
+            os.remove(self.path_for(reminder_id))
+        except FileNotFoundError:
+            pass
+
+    def _run(self):
+        while True:
+            reminder_id, text = self._queue.get()
+            try:
+                with self._lock:
+                    if reminder_id not in self._wanted or os.path.exists(self.path_for(reminder_id)):
+                        continue
+                tmp_path = os.path.join(self.cache_dir, f"{reminder_id}.tmp{self.ext}")
+                self.synthesize(text, tmp_path)
+                with self._lock:
+                    if reminder_id in self._wanted and os.path.exists(tmp_path):
+                        os.replace(tmp_path, self.path_for(reminder_id))
+                    elif os.path.exists(tmp_path):
+                        os.remove(tmp_path)  # evicted while we were synthesizing
+            except Exception as e:
+                print(f"[ReminderAudioCache] Synthesis failed for {reminder_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    # --- Public methods ---
+    def path_for(self, reminder_id):
+        return os.path.join(self.cache_dir, f"{reminder_id}{self.ext}")
+
+    def prepare(self, reminder):
+        """Queue background synthesis; a no-op if the audio is already cached."""
+        with self._lock:
+            self._wanted.add(reminder["id"])
+        self._queue.put((reminder["id"], self.spoken_text(reminder)))
+
+    def get(self, reminder_id):
+        """Path to the cached audio, or None if it is not ready (caller falls back to live TTS)."""
+        path = self.path_for(reminder_id)
+        return path if os.path.exists(path) else None
+
+    def evict(self, reminder_id):
+        with self._lock:
+            self._wanted.discard(reminder_id)
+            self._remove(reminder_id)
+
+    def join(self):
+        """Block until every queued reminder has been synthesized."""
+        self._queue.join()
+
+
+def elevenlabs_synthesizer(voice_id):
+    """synthesize(text, path) backed by ElevenLabs, for use with ReminderAudioCache(ext=".mp3")."""
+    from voice_gui_assistant import speak_with_elevenlabs
+
+    def synthesize(text, path):
+        if not speak_with_elevenlabs(text, voice_id, audio_path=path):
+            raise RuntimeError("ElevenLabs returned no audio")
+    return synthesize
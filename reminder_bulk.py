@@ -0,0 +1,228 @@
+import itertools
+from datetime import datetime, timedelta, timezone
+
+from time_parser import parse_due_time
+from recurrence import parse_recurrence, next_occurrence, describe
+
+CHUNK_SIZE = 256  # line-list items whose times are parsed together
+ICS_DAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+WEEKDAYS_BYDAY = "MO,TU,WE,TH,FR"
+
+
+# --- Reminder construction ---
+def make_reminder(text, due_time, rule=None):
+    reminder = {
+        "text": text.strip(),
+        "scheduled_time": due_time.isoformat(),
+        "due_ts": due_time.timestamp()
+    }
+    if rule:
+        reminder["recurrence"] = rule
+        reminder["repeat"] = describe(rule)
+    return reminder
+
+
+# --- Line lists: "text | when" per line ---
+def _resolve_phrases(phrases, now):
+    """Parse each distinct time phrase once: phrase -> rule dict, datetime, or None."""
+    resolved = {}
+    for phrase in phrases:
+        if phrase in resolved:
+            continue
+        rule = parse_recurrence(phrase, now)
+        resolved[phrase] = rule if rule else parse_due_time(phrase, now)
+    return resolved
+
+
+def iter_line_items(lines, now=None):
+    """
+    Yield (line_no, reminder, error) for a pasted list. Each line is
+    "text | when" (when defaults to 30 minutes from now). Time phrases are
+    parsed a chunk at a time, once per distinct phrase.
+    """
+    now = now or datetime.now()
+    numbered = ((n, line.strip()) for n, line in enumerate(lines, 1))
+    numbered = ((n, line) for n, line in numbered if line and not line.startswith("#"))
+    while True:
+        chunk = list(itertools.islice(numbered, CHUNK_SIZE))
+        if not chunk:
+            return
+        items = []
+        for n, line in chunk:
+            text, _, when = line.partition("|")
+            items.append((n, text.strip(), when.strip()))
+        resolved = _resolve_phrases((when for _, _, when in items if when), now)
+
+        for n, text, when in items:
+            if not text:
+                yield n, None, "missing reminder text"
+                continue
+            if not when:
+                yield n, make_reminder(text, now + timedelta(minutes=30)), None
+                continue
+            parsed = resolved[when]
+            if parsed is None:
+                yield n, None, f"could not understand time '{when}'"
+            elif isinstance(parsed, dict):
+                yield n, make_reminder(text, next_occurrence(parsed, now), parsed), None
+            else:
+                if parsed <= now:
+                    parsed += timedelta(days=1)  # same rule as add_reminder
+                yield n, make_reminder(text, parsed), None
+
+
+# --- iCalendar ---
+def _unfold(lines):
+    """Join RFC 5545 folded lines, keeping the number of the line each property starts on."""
+    current, start = None, 0
+    for n, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current, start = line, n
+    if current is not None:
+        yield start, current
+
+
+def _unescape(value):
+    out, chars = [], iter(value)
+    for ch in chars:
+        if ch == "\\":
+            nxt = next(chars, "")
+            out.append("\n" if nxt in ("n", "N") else nxt)
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _escape(value):
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\n", "\\n"))
+
+
+def _parse_ics_time(params, value):
+    """DATE / DATE-TIME value -> naive local datetime. UTC (Z) is converted; TZID is treated as local."""
+    value = value.strip()
+    if "VALUE=DATE" in params or len(value) == 8:
+        return datetime.strptime(value[:8], "%Y%m%d").replace(hour=9)  # all-day: remind at 9 am
+    if value.endswith("Z"):
+        utc = datetime.strptime(value[:-1], "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+        return utc.astimezone().replace(tzinfo=None)
+    return datetime.strptime(value, "%Y%m%dT%H%M%S")
+
+
+def _rule_from_rrule(rrule, start):
+    parts = dict(p.split("=", 1) for p in rrule.split(";") if "=" in p)
+    if "COUNT" in parts or "UNTIL" in parts:
+        raise ValueError("repeat rules with COUNT/UNTIL are not supported")
+    freq, interval = parts.get("FREQ"), int(parts.get("INTERVAL", 1))
+    byday = parts.get("BYDAY", "")
+    clock = {"hour": start.hour, "minute": start.minute}
+
+    if freq == "HOURLY":
+        return {"freq": "hourly", "interval": interval, "start": start.timestamp()}
+    if interval != 1:
+        raise ValueError(f"INTERVAL={interval} is only supported for hourly rules")
+    if freq == "DAILY" and not byday:
+        return {**clock, "freq": "daily"}
+    if freq in ("DAILY", "WEEKLY") and byday == WEEKDAYS_BYDAY:
+        return {**clock, "freq": "weekdays"}
+    if freq == "WEEKLY" and (not byday or byday in ICS_DAYS):
+        return {**clock, "freq": "weekly", "weekday": ICS_DAYS.index(byday) if byday else start.weekday()}
+    if freq == "MONTHLY" and not byday:
+        return {**clock, "freq": "monthly", "day": int(parts.get("BYMONTHDAY", start.day))}
+    raise ValueError(f"unsupported repeat rule '{rrule}'")
+
+
+def iter_ics_items(lines, now=None):
+    """
+    Stream VEVENT/VTODO components from an .ics file and yield
+    (line_no, reminder, error). Past one-off events are reported and skipped;
+    supported RRULEs become recurring reminders armed at their next occurrence.
+    """
+    now = now or datetime.now()
+    component, start_line = None, 0
+    for n, line in _unfold(lines):
+        name, _, value = line.partition(":")
+        prop, _, params = name.partition(";")
+        prop = prop.upper()
+
+        if prop == "BEGIN" and value.upper() in ("VEVENT", "VTODO"):
+            component, start_line = {}, n
+        elif component is None:
+            continue
+        elif prop == "END" and value.upper() in ("VEVENT", "VTODO"):
+            yield (start_line,) + _ics_component(component, now)
+            component = None
+        elif prop in ("SUMMARY", "DTSTART", "DUE", "RRULE"):
+            component[prop] = (params.upper(), value)
+
+
+def _ics_component(component, now):
+    text = _unescape(component.get("SUMMARY", ("", ""))[1]).strip()
+    when = component.get("DTSTART") or component.get("DUE")
+    if not text:
+        return None, "missing SUMMARY"
+    if not when:
+        return None, "missing DTSTART/DUE"
+    try:
+        due_time = _parse_ics_time(*when)
+        if "RRULE" in component:
+            rule = _rule_from_rrule(component["RRULE"][1].upper(), due_time)
+            if due_time <= now:
+                due_time = next_occurrence(rule, now)
+            return make_reminder(text, due_time, rule), None
+    except ValueError as e:
+        return None, str(e)
+    if due_time <= now:
+        return None, f"'{text}' is already past ({due_time:%Y-%m-%d %H:%M})"
+    return make_reminder(text, due_time), None
+
+
+def iter_import(lines, now=None):
+    """Pick the parser from the first non-blank line: BEGIN:VCALENDAR means .ics, anything else a line list."""
+    lines = iter(lines)
+    head = []
+    for line in lines:
+        head.append(line)
+        if line.strip():
+            break
+    is_ics = bool(head) and head[-1].strip().upper() == "BEGIN:VCALENDAR"
+    parser = iter_ics_items if is_ics else iter_line_items
+    return parser(itertools.chain(head, lines), now)
+
+
+def _rrule(rule):
+    freq = rule["freq"]
+    if freq == "hourly":
+        return f"FREQ=HOURLY;INTERVAL={rule['interval']}"
+    if freq == "daily":
+        return "FREQ=DAILY"
+    if freq == "weekdays":
+        return f"FREQ=WEEKLY;BYDAY={WEEKDAYS_BYDAY}"
+    if freq == "weekly":
+        return f"FREQ=WEEKLY;BYDAY={ICS_DAYS[rule['weekday']]}"
+    return f"FREQ=MONTHLY;BYMONTHDAY={rule['day']}"
+
+
+def iter_ics(reminders):
+    """Yield the lines of an .ics calendar with one VEVENT per reminder (floating local times)."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR"
+    yield "VERSION:2.0"
+    yield "PRODID:-//V1-chatbot//Reminders//EN"
+    for reminder in reminders:
+        if reminder.get("due_ts") is None:
+            continue
+        yield "BEGIN:VEVENT"
+        yield f"UID:{reminder['id']}@v1-chatbot"
+        yield f"DTSTAMP:{stamp}"
+        yield f"DTSTART:{datetime.fromtimestamp(reminder['due_ts']):%Y%m%dT%H%M%S}"
+        yield f"SUMMARY:{_escape(reminder['text'])}"
+        if reminder.get("recurrence"):
+            yield f"RRULE:{_rrule(reminder['recurrence'])}"
+        yield "END:VEVENT"
+    yield "END:VCALENDAR"
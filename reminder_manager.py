@@ -1,50 +1,57 @@
-import os
-import json
+import threading
 from datetime import datetime, timedelta
-import dateparser
+from time_parser import parse_due_time
+from reminder_store import ReminderStore
+from recurrence import parse_recurrence, next_occurrence, describe
+from reminder_bulk import iter_import, iter_ics
 
 
 class ReminderManager:
-    def __init__(self, user_id):
+    def __init__(self, user_id, audio_cache=None):
         self.user_id = user_id
-        self.file_path = f"{self.user_id}_reminders.json"
-        self.reminders = self._load()  # load directly
+        self.store = ReminderStore(user_id)  # journaled, sorted by due time
+        self.file_path = self.store.journal_path
+        self.scheduler = None  # set by ReminderScheduler.register()
+        self.scheduler_key = None
+        self._lock = threading.Lock()
+        self.audio_cache = None
+        if audio_cache:
+            self.attach_audio_cache(audio_cache)
 
-    # --- Internal helper methods ---
-    def _load(self):
-        if os.path.exists(self.file_path):
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                try:
-                    return json.load(f)
-                except json.JSONDecodeError:
-                    return []
-        else:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump([], f)
-            return []
-
-    def _save(self):
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            json.dump(self.reminders, f, indent=4)
+    @property
+    def reminders(self):
+        """All reminders in due-time order."""
+        return self.store.sorted_reminders()
 
     # --- Public methods ---
+    def attach_audio_cache(self, audio_cache):
+        """Pre-synthesize alert audio for new reminders (and any still pending that lack it)."""
+        self.audio_cache = audio_cache
+        for reminder in self.pending_reminders():
+            audio_cache.prepare(reminder)
+
     def add_reminder(self, text, due_time=None):
         """
         Add a new reminder. Supports optional due_time string from JS payload.
         If no due_time is provided, sets reminder 30 minutes from now.
         Accepts exact times like '5 pm' and calculates the correct future datetime.
+        Repeat phrases like 'every weekday at 8am' store one recurring rule.
         """
 
         # --- Extract due_time from JS payload if present ---
         if '|' in text:
-            text, due_time_str = text.split('|', 1)
-            due_time = dateparser.parse(due_time_str, settings={"PREFER_DATES_FROM": "future"})
+            text, due_time = text.split('|', 1)
+
+        now = datetime.now()
+
+        # --- Recurring rule: store it once, arm only the next occurrence ---
+        rule = parse_recurrence(due_time, now) if isinstance(due_time, str) else None
+        if rule:
+            return self._add_recurring(text, rule, now)
 
         # --- Parse natural language due_time string if still a string ---
         if isinstance(due_time, str):
-            due_time = dateparser.parse(due_time, settings={"PREFER_DATES_FROM": "future"})
-
-        now = datetime.now()
+            due_time = parse_due_time(due_time)
 
         # --- Default to 30 minutes from now if no valid due_time ---
         if not due_time:
@@ -59,40 +66,205 @@ class ReminderManager:
         # --- Store reminder ---
         reminder = {
             "text": text.strip(),
-            "scheduled_time": due_time.isoformat()
+            "scheduled_time": due_time.isoformat(),
+            "due_ts": due_time.timestamp()
         }
-        self.reminders.append(reminder)
-        self._save()
+        with self._lock:
+            reminder = self.store.add(reminder)
+        if self.audio_cache:
+            self.audio_cache.prepare(reminder)
+        if self.scheduler:
+            self.scheduler.schedule(self.scheduler_key, reminder)
 
         return {
             "success": True,
+            "id": reminder["id"],
             "response": f"✅ Reminder added: {text.strip()} at {due_time.strftime('%Y-%m-%d %I:%M %p')}"
         }
 
+    def _add_recurring(self, text, rule, now):
+        due_time = next_occurrence(rule, now)
+        reminder = {
+            "text": text.strip(),
+            "scheduled_time": due_time.isoformat(),
+            "due_ts": due_time.timestamp(),
+            "recurrence": rule,
+            "repeat": describe(rule)
+        }
+        with self._lock:
+            reminder = self.store.add(reminder)
+        if self.audio_cache:
+            self.audio_cache.prepare(reminder)
+        if self.scheduler:
+            self.scheduler.schedule(self.scheduler_key, reminder)
+
+        return {
+            "success": True,
+            "id": reminder["id"],
+            "response": f"🔁 Reminder added: {text.strip()} {reminder['repeat']} "
+                        f"(next: {due_time.strftime('%Y-%m-%d %I:%M %p')})"
+        }
+
+    def import_reminders(self, lines):
+        """
+        Bulk-add reminders from an iterable of lines (.ics file or "text | when"
+        list), streamed and written to the journal as a single commit.
+        Bad lines are skipped and reported with their line number.
+        """
+        added, errors = [], []
+        with self._lock:
+            self.store.begin_batch()
+            try:
+                for line_no, reminder, error in iter_import(lines):
+                    if error:
+                        errors.append({"line": line_no, "error": error})
+                    else:
+                        added.append(self.store.add(reminder))
+            finally:
+                self.store.end_batch()
+        for reminder in added:
+            if self.audio_cache:
+                self.audio_cache.prepare(reminder)
+            if self.scheduler:
+                self.scheduler.schedule(self.scheduler_key, reminder)
+
+        response = f"📥 Imported {len(added)} reminder(s)."
+        if errors:
+            response += f" ⚠️ {len(errors)} line(s) skipped."
+        return {"success": bool(added) or not errors, "response": response, "added": len(added), "errors": errors}
+
+    def export_ics(self):
+        """All reminders as an .ics calendar string."""
+        return "\r\n".join(iter_ics(self.reminders)) + "\r\n"
+
     def view_reminders(self):
         """Return all reminders sorted by due time."""
-        self.reminders.sort(key=lambda r: r["scheduled_time"])
-        if not self.reminders:
+        reminders = self.reminders
+        if not reminders:
             return {"success": True, "response": "🔕 No reminders saved.", "tasks": []}
-        return {"success": True, "response": f"📋 Reminders ({len(self.reminders)})", "tasks": self.reminders}
+        return {"success": True, "response": f"📋 Reminders ({len(reminders)})", "tasks": reminders}
 
     def check_due_reminders(self):
         """Return reminders that are due now."""
-        now = datetime.now()
-        due = []
-        for r in self.reminders:
-            try:
-                t = datetime.fromisoformat(r["scheduled_time"])
-                if t <= now:
-                    due.append(r)
-            except Exception:
-                continue  # skip malformed dates
-
+        due = self.store.due_before(datetime.now().timestamp())
         response = f"⏰ {len(due)} reminder(s) are due now." if due else "✅ No reminders are due right now."
         return {"success": True, "response": response, "tasks": due}
 
+    def complete_reminder(self, reminder_id):
+        """Mark one reminder as done (removes it from the active list)."""
+        with self._lock:
+            reminder = self.store.complete(reminder_id)
+        if reminder is None:
+            return {"success": False, "response": f"⚠️ No reminder with id {reminder_id}."}
+        if self.audio_cache:
+            self.audio_cache.evict(reminder_id)
+        return {"success": True, "response": f"✅ Completed: {reminder['text']}"}
+
+    def delete_reminder(self, reminder_id):
+        """Delete one reminder without completing it."""
+        with self._lock:
+            reminder = self.store.delete(reminder_id)
+        if reminder is None:
+            return {"success": False, "response": f"⚠️ No reminder with id {reminder_id}."}
+        if self.audio_cache:
+            self.audio_cache.evict(reminder_id)
+        return {"success": True, "response": f"🗑️ Deleted: {reminder['text']}"}
+
+    def pending_reminders(self):
+        """Reminders that have not been pushed to the user yet."""
+        return [r for r in self.reminders if not r.get("notified") and r.get("due_ts") is not None]
+
+    def mark_notified(self, reminder):
+        """
+        Record that a reminder was delivered. Returns False if it was already
+        delivered, re-armed or no longer exists, so each occurrence fires exactly once.
+        Recurring reminders are re-armed to their next occurrence instead.
+        """
+        with self._lock:
+            current = self.store.get(reminder.get("id"))
+            # Updates replace the stored dict, so a heap entry for an older version is stale
+            if current is not reminder or current.get("notified"):
+                return False
+            rule = current.get("recurrence")
+            if not rule:
+                self.store.update(current["id"], notified=True)
+                return True
+            # Skip any occurrences missed while offline: one step to the next future one
+            after = max(datetime.now(), datetime.fromtimestamp(current["due_ts"]))
+            due_time = next_occurrence(rule, after)
+            current = self.store.update(current["id"], scheduled_time=due_time.isoformat(),
+                                        due_ts=due_time.timestamp())
+        if self.scheduler:
+            self.scheduler.schedule(self.scheduler_key, current)
+        return True
+
     def clear_reminders(self):
         """Delete all reminders."""
-        self.reminders = []
-        self._save()
+        with self._lock:
+            cleared = list(self.store.by_id)
+            self.store.clear()
+        if self.audio_cache:
+            for reminder_id in cleared:
+                self.audio_cache.evict(reminder_id)
         return {"success": True, "response": "✅ All reminders have been successfully cleared.", "tasks": []}
+
+
+def handle_reminder_mode(user_name, memory_logger):
+    """CLI reminder mode (mode 10)."""
+    from voice_input import get_input  # microphone deps are only needed for the CLI
+
+    reminder_manager = ReminderManager(user_name)
+    print("\n=== ⏰ Reminder Mode ===")
+    print("Commands: add, view, due, done <id>, delete <id>, clear, bulk, export, back")
+
+    while True:
+        command = get_input("Reminder command: ").strip()
+        cmd, _, arg = command.partition(" ")
+        arg = arg.strip()
+
+        if cmd == "back":
+            print("🔙 Returning to previous menu...\n")
+            break
+        elif cmd == "add":
+            text = arg or input("Reminder text: ").strip()
+            when = input("When? (e.g. 'in 10 minutes', 'every weekday at 8am'; blank = 30 min): ").strip()
+            result = reminder_manager.add_reminder(text, when or None)
+        elif cmd in ("view", "show"):
+            result = reminder_manager.view_reminders()
+            for task in result["tasks"]:
+                repeat = f" ({task['repeat']})" if task.get("repeat") else ""
+                print(f"  [{task['id'][:8]}] {task['scheduled_time']}  {task['text']}{repeat}")
+        elif cmd in ("due", "check"):
+            result = reminder_manager.check_due_reminders()
+        elif cmd in ("done", "complete", "delete", "remove") and arg:
+            matches = [r["id"] for r in reminder_manager.reminders if r["id"].startswith(arg)]
+            reminder_id = matches[0] if len(matches) == 1 else arg
+            if cmd in ("done", "complete"):
+                result = reminder_manager.complete_reminder(reminder_id)
+            else:
+                result = reminder_manager.delete_reminder(reminder_id)
+        elif cmd == "clear":
+            result = reminder_manager.clear_reminders()
+        elif cmd == "bulk":
+            path = input("Path to an .ics or text file (blank to paste lines, end with an empty line): ").strip()
+            if path:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        result = reminder_manager.import_reminders(f)
+                except OSError as e:
+                    result = {"success": False, "response": f"❌ Could not read {path}: {e}"}
+            else:
+                result = reminder_manager.import_reminders(iter(lambda: input("> "), ""))
+            for error in result.get("errors", []):
+                print(f"  line {error['line']}: {error['error']}")
+        elif cmd == "export":
+            path = f"{user_name}_reminders.ics"
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(reminder_manager.export_ics())
+            result = {"success": True, "response": f"📤 Exported {len(reminder_manager.reminders)} reminder(s) to {path}"}
+        else:
+            print("❌ Unknown command. Use add, view, due, done <id>, delete <id>, clear, bulk, export, or back.")
+            continue
+
+        print(result["response"])
+        memory_logger.log_interaction(f"Reminder command: {command}", result["response"], tags=["reminder", cmd])
@@ -0,0 +1,84 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class ReminderScheduler:
+    """
+    One timer thread for every user's reminders.
+
+    Pending reminders sit in a min-heap keyed on their due time (epoch
+    seconds). The thread sleeps until the earliest one is due (or until an
+    earlier reminder is scheduled), fires it exactly once through the
+    `deliver(user_id, reminder)` callback, and marks it notified on its
+    ReminderManager so a restart will not fire it again (recurring reminders
+    are re-armed there and pushed back as their next occurrence). Reminders
+    that were cleared or changed in the meantime are skipped when they reach
+    the top of the heap.
+    """
+
+    def __init__(self, deliver):
+        self.deliver = deliver
+        self._heap = []
+        self._counter = itertools.count()  # tie-breaker so dicts are never compared
+        self._managers = {}
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # --- Public methods ---
+    def register(self, user_id, manager):
+        """Attach a user's ReminderManager and schedule all of its pending reminders."""
+        with self._cond:
+            if self._managers.get(user_id) is manager:
+                return
+            self._managers[user_id] = manager
+            manager.scheduler = self
+            manager.scheduler_key = user_id
+        for reminder in manager.pending_reminders():
+            self.schedule(user_id, reminder)
+
+    def unregister(self, user_id):
+        """
+        Detach a user's ReminderManager. Its reminders stay pending (nothing is
+        marked notified), so register() again delivers any that came due meanwhile.
+        """
+        with self._cond:
+            manager = self._managers.pop(user_id, None)
+            if manager is not None and manager.scheduler is self:
+                manager.scheduler = None
+
+    def schedule(self, user_id, reminder):
+        due = reminder.get("due_ts")
+        if due is None:
+            return
+        with self._cond:
+            heapq.heappush(self._heap, (due, next(self._counter), user_id, reminder))
+            if self._heap[0][3] is reminder:
+                self._cond.notify()  # new earliest deadline; re-arm the timer
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._heap)
+
+    # --- Timer thread ---
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                due, _, user_id, reminder = self._heap[0]
+                delay = due - time.time()
+                if delay > 0:
+                    self._cond.wait(timeout=delay)
+                    continue  # re-check: an earlier reminder may have been pushed
+                heapq.heappop(self._heap)
+                manager = self._managers.get(user_id)
+
+            if manager is None or not manager.mark_notified(reminder):
+                continue  # cleared, replaced, or already delivered
+            try:
+                self.deliver(user_id, reminder)
+            except Exception as e:
+                print(f"[ReminderScheduler] Delivery failed for {user_id}: {e}")
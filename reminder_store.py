@@ -0,0 +1,176 @@
+import os
+import json
+import uuid
+from datetime import datetime
+
+from sorted_index import SortedIndex
+
+INFINITY = float("inf")
+
+
+class ReminderStore:
+    """
+    Journaled reminder storage with an always-sorted due-time index.
+
+    Every change is one JSON line appended to {user}_reminders.journal
+    (add / update / complete / delete / clear), so a write costs O(1) bytes
+    instead of rewriting the whole list. In memory, reminders are kept by id
+    plus a SortedIndex of (due_ts, id), so adds/removals are O(log n) and
+    views never re-sort. The journal is compacted to one "add" per live
+    reminder once it holds mostly dead entries.
+    """
+
+    def __init__(self, user_id, compact_ratio=2, compact_min=100):
+        self.user_id = user_id
+        self.journal_path = f"{user_id}_reminders.journal"
+        self.legacy_path = f"{user_id}_reminders.json"
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+
+        self.by_id = {}
+        self.index = SortedIndex()
+        self._journal_ops = 0
+        self._batch = None
+        self._load()
+
+    # --- Internal helpers ---
+    @staticmethod
+    def ensure_due_ts(reminder):
+        """Cache the due time as epoch seconds so it is parsed once, not on every check."""
+        if "due_ts" not in reminder:
+            try:
+                reminder["due_ts"] = datetime.fromisoformat(reminder["scheduled_time"]).timestamp()
+            except (KeyError, TypeError, ValueError):
+                reminder["due_ts"] = None  # malformed date; never due
+        return reminder["due_ts"]
+
+    @staticmethod
+    def _key(reminder):
+        due = reminder.get("due_ts")
+        return (INFINITY if due is None else due, reminder["id"])
+
+    def _apply(self, op):
+        kind = op.get("op")
+        if kind == "add":
+            reminder = op["reminder"]
+            self._remove(reminder["id"])
+            self.by_id[reminder["id"]] = reminder
+            self.index.add(self._key(reminder))
+        elif kind == "update":
+            reminder = self.by_id.get(op["id"])
+            if reminder is not None:
+                # Replace rather than mutate, so callers holding the old dict
+                # (e.g. a scheduler heap entry) still see the occurrence they fired
+                self.index.remove(self._key(reminder))
+                reminder = self.by_id[op["id"]] = {**reminder, **op["fields"]}
+                self.index.add(self._key(reminder))
+        elif kind in ("complete", "delete"):
+            self._remove(op["id"])
+        elif kind == "clear":
+            self.by_id = {}
+            self.index.clear()
+
+    def _remove(self, reminder_id):
+        reminder = self.by_id.pop(reminder_id, None)
+        if reminder is not None:
+            self.index.remove(self._key(reminder))
+        return reminder
+
+    def _load(self):
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        op = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line from a crash
+                    self._apply(op)
+                    self._journal_ops += 1
+        elif os.path.exists(self.legacy_path):
+            # One-time migration from the old whole-file JSON list
+            try:
+                with open(self.legacy_path, "r", encoding="utf-8") as f:
+                    legacy = json.load(f)
+            except json.JSONDecodeError:
+                legacy = []
+            for reminder in legacy:
+                reminder.setdefault("id", uuid.uuid4().hex)
+                self.ensure_due_ts(reminder)
+                self._apply({"op": "add", "reminder": reminder})
+            self.compact()
+            os.replace(self.legacy_path, self.legacy_path + ".migrated")
+
+    def _write(self, ops):
+        if self._batch is not None:
+            self._batch.extend(ops)
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops))
+        self._journal_ops += len(ops)
+        if self._journal_ops > max(self.compact_min, self.compact_ratio * len(self.by_id)):
+            self.compact()
+
+    def _commit(self, *ops):
+        for op in ops:
+            self._apply(op)
+        self._write(list(ops))
+
+    # --- Public methods ---
+    def __len__(self):
+        return len(self.by_id)
+
+    def get(self, reminder_id):
+        return self.by_id.get(reminder_id)
+
+    def add(self, reminder):
+        reminder.setdefault("id", uuid.uuid4().hex)
+        self.ensure_due_ts(reminder)
+        self._commit({"op": "add", "reminder": reminder})
+        return reminder
+
+    def update(self, reminder_id, **fields):
+        if reminder_id not in self.by_id:
+            return None
+        self._commit({"op": "update", "id": reminder_id, "fields": fields})
+        return self.by_id[reminder_id]
+
+    def complete(self, reminder_id):
+        reminder = self.by_id.get(reminder_id)
+        if reminder is not None:
+            self._commit({"op": "complete", "id": reminder_id})
+        return reminder
+
+    def delete(self, reminder_id):
+        reminder = self.by_id.get(reminder_id)
+        if reminder is not None:
+            self._commit({"op": "delete", "id": reminder_id})
+        return reminder
+
+    def clear(self):
+        self._commit({"op": "clear"})
+
+    def sorted_reminders(self):
+        """All reminders in due-time order (no sorting at read time)."""
+        return [self.by_id[rid] for _, rid in self.index]
+
+    def due_before(self, timestamp):
+        """Reminders due at or before timestamp: O(log n + k)."""
+        return [self.by_id[rid] for _, rid in self.index.irange(None, (timestamp, chr(0x10FFFF)))]
+
+    def begin_batch(self):
+        """Buffer journal writes until end_batch(), so a bulk change lands as one write."""
+        self._batch = []
+
+    def end_batch(self):
+        ops, self._batch = self._batch or [], None
+        if ops:
+            self._write(ops)
+
+    def compact(self):
+        """Rewrite the journal as one add per live reminder (atomic rename)."""
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for reminder in self.sorted_reminders():
+                f.write(json.dumps({"op": "add", "reminder": reminder}, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.journal_path)
+        self._journal_ops = len(self.by_id)
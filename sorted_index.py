@@ -0,0 +1,132 @@
+from bisect import bisect_left, bisect_right, insort
+
+
+class SortedIndex:
+    """
+    Always-sorted collection of comparable keys (usually tuples).
+
+    Keys live in a list of small sorted chunks, so inserts and removals shift
+    at most one chunk instead of the whole list, and nothing ever needs a
+    full re-sort. Iteration from either end is lazy, which makes "first N"
+    and "everything up to X" queries cost only what they return.
+    """
+
+    def __init__(self, keys=(), chunk_size=256):
+        self._chunk_size = chunk_size
+        self._chunks = []
+        self._maxes = []
+        self._len = 0
+        keys = sorted(keys)
+        for i in range(0, len(keys), chunk_size):
+            chunk = keys[i:i + chunk_size]
+            self._chunks.append(chunk)
+            self._maxes.append(chunk[-1])
+        self._len = len(keys)
+
+    # --- Internal helpers ---
+    def _locate(self, key):
+        """Return (chunk index, position) where key is or would be inserted."""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return i, 0
+        return i, bisect_left(self._chunks[i], key)
+
+    # --- Public methods ---
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            yield from chunk
+
+    def __reversed__(self):
+        for chunk in reversed(self._chunks):
+            yield from reversed(chunk)
+
+    def __contains__(self, key):
+        i, j = self._locate(key)
+        return i < len(self._chunks) and self._chunks[i][j] == key
+
+    def add(self, key):
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+        chunk = self._chunks[i]
+        insort(chunk, key)
+        self._maxes[i] = chunk[-1]
+        self._len += 1
+        if len(chunk) > 2 * self._chunk_size:
+            half = len(chunk) // 2
+            self._chunks[i:i + 1] = [chunk[:half], chunk[half:]]
+            self._maxes[i:i + 1] = [chunk[half - 1], chunk[-1]]
+
+    def remove(self, key):
+        i, j = self._locate(key)
+        if i == len(self._chunks) or self._chunks[i][j] != key:
+            raise KeyError(key)
+        chunk = self._chunks[i]
+        del chunk[j]
+        self._len -= 1
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+
+    def discard(self, key):
+        try:
+            self.remove(key)
+        except KeyError:
+            pass
+
+    def rank(self, key):
+        """Number of keys strictly smaller than key."""
+        i, j = self._locate(key)
+        return sum(len(chunk) for chunk in self._chunks[:i]) + j
+
+    def first(self):
+        return self._chunks[0][0] if self._chunks else None
+
+    def last(self):
+        return self._chunks[-1][-1] if self._chunks else None
+
+    def slice(self, start, stop):
+        """Keys at positions [start, stop) without materialising the rest."""
+        out = []
+        skip = start
+        for chunk in self._chunks:
+            if skip >= len(chunk):
+                skip -= len(chunk)
+                continue
+            out.extend(chunk[skip:skip + (stop - start - len(out))])
+            skip = 0
+            if len(out) >= stop - start:
+                break
+        return out
+
+    def irange(self, minimum=None, maximum=None):
+        """Iterate keys with minimum <= key <= maximum in order."""
+        if minimum is None:
+            i, j = 0, 0
+        else:
+            i, j = self._locate(minimum)
+        while i < len(self._chunks):
+            chunk = self._chunks[i]
+            stop = len(chunk) if maximum is None else bisect_right(chunk, maximum)
+            yield from chunk[j:stop]
+            if stop < len(chunk):
+                return
+            i, j = i + 1, 0
+
+    def clear(self):
+        self._chunks = []
+        self._maxes = []
+        self._len = 0
@@ -0,0 +1,133 @@
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+# --- Compiled grammar for the phrases reminders actually use ---
+_UNITS = {
+    "s": 1, "sec": 1, "secs": 1, "second": 1, "seconds": 1,
+    "m": 60, "min": 60, "mins": 60, "minute": 60, "minutes": 60,
+    "h": 3600, "hr": 3600, "hrs": 3600, "hour": 3600, "hours": 3600,
+    "d": 86400, "day": 86400, "days": 86400,
+    "w": 604800, "week": 604800, "weeks": 604800,
+}
+_WEEKDAYS = {
+    "monday": 0, "mon": 0, "tuesday": 1, "tue": 1, "tues": 1, "wednesday": 2, "wed": 2,
+    "thursday": 3, "thu": 3, "thurs": 3, "friday": 4, "fri": 4, "saturday": 5, "sat": 5,
+    "sunday": 6, "sun": 6,
+}
+
+_OFFSET_RE = re.compile(
+    r"^in\s+(?P<n>\d+(?:\.\d+)?|an?|one|half\s+an?)\s+(?P<unit>" + "|".join(sorted(_UNITS, key=len, reverse=True)) + r")$"
+)
+_CLOCK = r"(?:(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<ampm>am|pm|a\.m\.|p\.m\.)?|(?P<named>noon|midnight))"
+_DAY = r"(?:(?P<day>today|tonight|tomorrow|tmrw|tmr)|(?:on\s+)?(?:(?P<next>next|this)\s+)?(?P<weekday>" + "|".join(_WEEKDAYS) + r"))"
+_DATETIME_RE = re.compile(
+    r"^(?:" + _DAY + r")?\s*(?:(?:at|@)\s*)?(?:" + _CLOCK + r")?$"
+)
+
+
+def _normalize(text):
+    return re.sub(r"\s+", " ", text.strip().lower().rstrip(".!"))
+
+
+@lru_cache(maxsize=512)
+def _compile_phrase(phrase):
+    """
+    Turn a normalized phrase into a now-independent spec, or None if the fast
+    grammar does not cover it. Cached, so repeated phrases skip the regexes.
+      ("offset", seconds)
+      ("clock", day_word, weekday, hour, minute)
+    """
+    match = _OFFSET_RE.match(phrase)
+    if match:
+        n = match.group("n")
+        if n in ("a", "an", "one"):
+            amount = 1.0
+        elif n.startswith("half"):
+            amount = 0.5
+        else:
+            amount = float(n)
+        return ("offset", amount * _UNITS[match.group("unit")])
+
+    match = _DATETIME_RE.match(phrase)
+    if not match or not phrase:
+        return None
+
+    day, weekday = match.group("day"), match.group("weekday")
+    hour, minute = None, 0
+    if match.group("named"):
+        hour = 12 if match.group("named") == "noon" else 0
+    elif match.group("hour"):
+        hour = int(match.group("hour"))
+        minute = int(match.group("minute") or 0)
+        ampm = (match.group("ampm") or "").replace(".", "")
+        if minute > 59 or hour > 23 or (ampm and not 1 <= hour <= 12):
+            return None
+        if ampm == "pm" and hour != 12:
+            hour += 12
+        elif ampm == "am" and hour == 12:
+            hour = 0
+        elif not ampm and not match.group("minute") and not (day or weekday):
+            return None  # a bare number like "5" is too ambiguous for the fast path
+    elif not (day or weekday):
+        return None
+
+    if day == "tonight" and hour is None:
+        hour = 20
+    elif day == "tonight" and hour < 12:
+        hour += 12
+    if day in ("tmrw", "tmr"):
+        day = "tomorrow"
+    return ("clock", day, _WEEKDAYS.get(weekday), hour, minute)
+
+
+def _resolve(spec, now):
+    if spec[0] == "offset":
+        return now + timedelta(seconds=spec[1])
+
+    _, day, weekday, hour, minute = spec
+    base = now
+    if day == "tomorrow":
+        base = now + timedelta(days=1)
+    elif weekday is not None:
+        days_ahead = (weekday - now.weekday()) % 7 or 7
+        base = now + timedelta(days=days_ahead)
+
+    if hour is None:
+        return base  # e.g. "tomorrow" keeps the current time of day, like dateparser
+    resolved = base.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if day is None and weekday is None and resolved <= now:
+        resolved += timedelta(days=1)  # "5 pm" after 5 pm means tomorrow
+    return resolved
+
+
+def parse_fast(text, now=None):
+    """Fast-path parse only; returns None on a grammar miss."""
+    spec = _compile_phrase(_normalize(text))
+    if spec is None:
+        return None
+    return _resolve(spec, now or datetime.now())
+
+
+def parse_due_time(text, now=None):
+    """
+    Parse a natural-language due time ("in 10 minutes", "5 pm", "tomorrow at 9",
+    "next monday"). Common phrases are handled by the compiled grammar above;
+    anything else falls back to dateparser, which is only imported on a miss.
+    """
+    if not text or not text.strip():
+        return None
+    parsed = parse_fast(text, now)
+    if parsed is not None:
+        return parsed
+
+    import dateparser
+    settings = {"PREFER_DATES_FROM": "future"}
+    if now is not None:
+        settings["RELATIVE_BASE"] = now
+    return dateparser.parse(text, settings=settings)
+
+
+def cache_info():
+    """Hit/miss counters for the phrase cache."""
+    return _compile_phrase.cache_info()
@@ -24,6 +24,7 @@ GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
 
 positive_words = {"happy", "great", "good", "love", "excited", "awesome", "joy", "grateful", "fun"}
 negative_words = {"sad", "tired", "depressed", "upset", "angry", "bad", "lonely", "anxious"}
+MAX_CHAT_BELIEFS = 200
 
 def clean_text(text):
     # Remove non-ASCII characters to prevent API errors
@@ -67,8 +68,8 @@ def get_cache_path(text):
     return os.path.join(cache_dir, f"{hashed_name}.mp3")
 
 
-def speak_with_elevenlabs(text, voice_id):
-    audio_path = get_cache_path(text)
+def speak_with_elevenlabs(text, voice_id, audio_path=None):
+    audio_path = audio_path or get_cache_path(text)
     text = clean_text(text[:2400])
     if os.path.exists(audio_path):
         return audio_path
@@ -105,7 +106,8 @@ class VisualCompanionApp:
         self.root.title("🧠 AI Companion")
 
         self.user_name = user_name or simpledialog.askstring("Welcome!", "What's your name?", parent=root) or "Friend"
-        self.belief_model = BeliefModel(self.user_name)
+        # Free-text reinforcement can see any word, so keep only the heaviest hitters
+        self.belief_model = BeliefModel(self.user_name, max_beliefs=MAX_CHAT_BELIEFS)
 
         self.past_questions = set()
         self.user_memory = []
@@ -1,7 +1,10 @@
 import threading
 import speech_recognition as sr
 import pyttsx3
+import pygame
 from reminder_manager import ReminderManager
+from reminder_audio import ReminderAudioCache
+from reminder_scheduler import ReminderScheduler
 import sounddevice as sd
 import numpy as np
 import queue
@@ -13,10 +16,27 @@ class VoiceEngine:
         self.engine = pyttsx3.init()
         self.engine.setProperty('rate', 160)
         self.engine.setProperty('volume', 1.0)
+        self._lock = threading.Lock()  # pyttsx3 allows one run loop at a time
 
     def speak(self, text: str):
-        self.engine.say(text)
-        self.engine.runAndWait()
+        with self._lock:
+            self.engine.say(text)
+            self.engine.runAndWait()
+
+    def save_to_file(self, text: str, path: str):
+        """Render speech to an audio file instead of the speakers."""
+        with self._lock:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+
+    def play_file(self, path: str):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.play()
+        clock = pygame.time.Clock()
+        while pygame.mixer.music.get_busy():
+            clock.tick(30)
 
 # ------------------ Voice Listener ------------------
 
@@ -29,11 +49,21 @@ class VoiceReminderListener:
         self.listening = False
         self.thread = None
         self.audio_queue = queue.Queue()
+        self.scheduler = None
+
+        # Alerts are synthesized when a reminder is added, so they play instantly when due
+        if reminder_manager.audio_cache is None:
+            reminder_manager.attach_audio_cache(ReminderAudioCache(self.voice_engine.save_to_file))
 
     # Start listening in a separate thread
     def start(self):
         if not self.listening:
             self.listening = True
+            # Our own timer unless another scheduler (e.g. the web app's) already delivers them
+            if self.reminder_manager.scheduler is None or self.reminder_manager.scheduler is self.scheduler:
+                if self.scheduler is None:
+                    self.scheduler = ReminderScheduler(lambda user_id, reminder: self.announce_reminder(reminder))
+                self.scheduler.register(self.user_id, self.reminder_manager)
             self.thread = threading.Thread(target=self.listen_loop, daemon=True)
             self.thread.start()
             self.voice_engine.speak("Voice reminder mode activated.")
@@ -41,8 +71,28 @@ class VoiceReminderListener:
     # Stop listening
     def stop(self):
         self.listening = False
+        if self.scheduler:
+            # Nothing fires while stopped; due reminders are announced on the next start()
+            self.scheduler.unregister(self.user_id)
         self.voice_engine.speak("Voice reminder mode deactivated.")
 
+    # ------------------ Reminder Alerts ------------------
+
+    def announce_reminder(self, reminder):
+        """Play the pre-synthesized alert; fall back to live TTS if it is not cached yet."""
+        print(f"[WREN Reminder] {reminder['text']}")
+        if not self.listening:
+            return  # stopped between delivery and now: it has been shown above at least
+        audio_cache = self.reminder_manager.audio_cache
+        audio_path = audio_cache.get(reminder["id"]) if audio_cache else None
+        try:
+            if audio_path:
+                self.voice_engine.play_file(audio_path)
+                return
+        except Exception as e:
+            print(f"🎧 Playback error: {e}")
+        self.voice_engine.speak(ReminderAudioCache.spoken_text(reminder))
+
     # ------------------ Listening Loop (SoundDevice) ------------------
 
     def listen_loop(self):
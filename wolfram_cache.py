@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import deque
+
+
+def normalize_question(question: str) -> str:
+    """Cache key text: lower-case, single spaces, no trailing punctuation."""
+    return " ".join(question.lower().split()).rstrip("?!. ")
+
+
+class WolframCache:
+    """
+    On-disk TTL cache in front of a slow lookup (the Wolfram Alpha API).
+
+    Each answer is one JSON file under `directory`, named by a hash of the
+    normalized question, so it survives restarts and is shared by every
+    process using the same directory. Concurrent misses for the same
+    question are coalesced: the first caller fetches and the rest wait for
+    its answer (singleflight). Only answers accepted by `is_cacheable` are
+    stored, so transient errors are retried next time.
+    """
+
+    LATENCY_WINDOW = 200
+
+    def __init__(self, fetch, directory=os.path.join("cache", "wolfram"), ttl=7 * 86400, is_cacheable=None):
+        self.fetch = fetch
+        self.directory = directory
+        self.ttl = ttl
+        self.is_cacheable = is_cacheable or (lambda value: True)
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> [Event, result]
+        self._latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+        self.upstream_errors = 0
+
+    # --- Internal helpers ---
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _read(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if entry.get("question") != key:
+            return None  # hash collision
+        if time.time() - entry.get("stored_at", 0) > self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry["answer"]
+
+    def _write(self, key, answer):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"question": key, "stored_at": time.time(), "answer": answer}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _fetch(self, question, key):
+        start = time.perf_counter()
+        try:
+            answer = self.fetch(question)
+        except Exception as e:
+            answer, ok = f"⚠️ Wolfram Alpha error: {e}", False
+        else:
+            ok = self.is_cacheable(answer)
+        with self._lock:
+            self.upstream_calls += 1
+            self.upstream_errors += not ok
+            self._latencies.append(time.perf_counter() - start)
+        if ok:
+            self._write(key, answer)
+        return answer
+
+    # --- Public methods ---
+    def get(self, question):
+        key = normalize_question(question)
+        answer = self._read(key)
+        if answer is not None:
+            with self._lock:
+                self.hits += 1
+            return answer
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            if flight is None:
+                flight = self._inflight[key] = [threading.Event(), None]
+                leader = True
+                self.misses += 1
+            else:
+                leader = False
+                self.coalesced += 1
+
+        if not leader:
+            flight[0].wait()
+            return flight[1]
+        try:
+            flight[1] = self._fetch(question, key)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight[0].set()
+        return flight[1]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            latencies = sorted(self._latencies)
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1) if latencies else None
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+            "upstream_calls": self.upstream_calls,
+            "upstream_errors": self.upstream_errors,
+            "upstream_ms_p50": percentile(0.5),
+            "upstream_ms_p95": percentile(0.95),
+        }